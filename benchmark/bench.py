@@ -36,6 +36,20 @@ def run_case(method, content, count=100):
     return duration * 1000
 
 
+def render_only(md):
+    """Render the parsed tokens of a case again, the parsing is excluded."""
+    states = {}
+
+    def render(content):
+        state = states.get(content)
+        if state is None:
+            _, state = md.parse(content)
+            states[content] = state
+        return md.renderer(state.tokens, state)
+
+    return render
+
+
 def get_markdown_parsers():
     parsers = {}
 
@@ -70,6 +84,11 @@ def get_markdown_parsers():
         ],
     )
 
+    parsers["mistune (blocks only)"] = mistune.create_markdown(renderer=None).parse_blocks
+    parsers["mistune (render only)"] = render_only(
+        mistune.create_markdown(escape=False, plugins=["table", "footnotes"])
+    )
+
     try:
         import mistune_v1
 
@@ -55,6 +55,8 @@ MATH = markdown_factory(plugins=["math"])
 FOOTNOTES = markdown_factory(plugins=["footnotes"])
 GITHUB = markdown_factory(plugins=["table", "task_lists"])
 
+PROSE_LINE = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore.\n"
+
 
 EDGE_CASES = {
     "deep-blockquote": EdgeCase("deep-blockquote", "containers", lambda n: "> " * n + "text\n", CORE, (100, 1000, 10000)),
@@ -107,6 +109,9 @@ EDGE_CASES = {
     "list-marker-interrupt": EdgeCase(
         "list-marker-interrupt", "blocks", lambda n: "paragraph\n1. " + " " * n + "\n", CORE, (1000, 10000, 100000)
     ),
+    "long-prose": EdgeCase(
+        "long-prose", "blocks", lambda n: (PROSE_LINE * 20 + "\n") * n, CORE, (500, 1000, 2000)
+    ),
     "unclosed-fence": EdgeCase(
         "unclosed-fence", "blocks", lambda n: "```\n" + "line\n" * n, CORE, (1000, 5000, 10000)
     ),
@@ -8,6 +8,8 @@ plugins, compatible with CommonMark 0.31.2.
 Documentation: https://mistune.lepture.com/
 """
 
+import threading
+from collections import OrderedDict
 from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
 
 from .block_parser import BlockParser
@@ -16,6 +18,7 @@ from .inline_parser import InlineParser
 from .markdown import Markdown
 from .plugins import Plugin, PluginRef, import_plugin
 from .renderers.html import HTMLRenderer
+from .tokens import LazyToken
 from .util import escape, escape_url, safe_entity, unikey
 
 RendererRef = Union[Literal["html", "ast"], BaseRenderer]
@@ -59,7 +62,21 @@ def create_markdown(
 html: Markdown = create_markdown(escape=False, plugins=["strikethrough", "footnotes", "table"])
 
 
-__cached_parsers: Dict[Tuple[bool, Optional[RendererRef], Optional[Iterable[Any]]], Markdown] = {}
+__cached_parsers: "OrderedDict[Tuple[Any, ...], Markdown]" = OrderedDict()
+__cached_parsers_lock = threading.Lock()
+__cached_parsers_maxsize = 32
+
+
+def set_markdown_cache_size(maxsize: int) -> None:
+    """Set the max number of ``Markdown`` instances cached by the
+    :func:`markdown` function, the least recently used instances are
+    evicted at first. Set ``0`` to disable the cache.
+    """
+    global __cached_parsers_maxsize
+    with __cached_parsers_lock:
+        __cached_parsers_maxsize = maxsize
+        while len(__cached_parsers) > maxsize:
+            __cached_parsers.popitem(last=False)
 
 
 def markdown(
@@ -68,16 +85,37 @@ def markdown(
     renderer: Optional[RendererRef] = "html",
     plugins: Optional[Iterable[Any]] = None,
 ) -> Union[str, List[Dict[str, Any]]]:
+    """Convert the markdown text. The ``Markdown`` instances are cached by
+    the given options, so that it is fast to call it again::
+
+        mistune.markdown(text, plugins=['table', 'url'])
+    """
     if renderer == "ast":
         # explicit and more similar to 2.x's API
         renderer = None
-    key = (escape, renderer, plugins)
-    if key in __cached_parsers:
-        return __cached_parsers[key](text)
 
-    md = create_markdown(escape=escape, renderer=renderer, plugins=plugins)
-    # improve the speed for markdown parser creation
-    __cached_parsers[key] = md
+    real_plugins: Optional[Tuple[Plugin, ...]] = None
+    if plugins is not None:
+        real_plugins = tuple(import_plugin(n) for n in plugins if n != "speedup")
+
+    key = (escape, renderer, real_plugins)
+    try:
+        hash(key)
+    except TypeError:
+        return create_markdown(escape=escape, renderer=renderer, plugins=real_plugins)(text)
+
+    with __cached_parsers_lock:
+        md = __cached_parsers.get(key)
+        if md is not None:
+            __cached_parsers.move_to_end(key)
+
+    if md is None:
+        md = create_markdown(escape=escape, renderer=renderer, plugins=real_plugins)
+        # improve the speed for markdown parser creation
+        with __cached_parsers_lock:
+            __cached_parsers[key] = md
+            while len(__cached_parsers) > __cached_parsers_maxsize:
+                __cached_parsers.popitem(last=False)
     return md(text)
 
 
@@ -89,6 +127,7 @@ __all__ = [
     "BaseRenderer",
     "InlineParser",
     "InlineState",
+    "LazyToken",
     "escape",
     "escape_url",
     "safe_entity",
@@ -96,6 +135,7 @@ __all__ = [
     "html",
     "create_markdown",
     "markdown",
+    "set_markdown_cache_size",
 ]
 
 __version__ = "3.4.0"
@@ -4,9 +4,8 @@ from bisect import bisect_left
 from typing import TYPE_CHECKING, Dict, List, Match, Optional, Tuple
 
 from ..core import InlineState
+from ..helpers import find_ref_key, parse_link_label, parse_link_with_end
 from ..helpers import parse_link as parse_link_destination
-from ..helpers import parse_link_label, parse_link_with_end
-from ..util import unikey
 
 if TYPE_CHECKING:
     from ..inline_parser import InlineParser
@@ -104,8 +103,8 @@ def parse_link(inline: "InlineParser", m: Match[str], state: InlineState) -> Opt
         mark_no_link_before(state, body_end_pos)
         return None
 
-    key = unikey(label)
-    env = ref_links.get(key)
+    key = find_ref_key(state.env, "ref_links", label)
+    env = ref_links[key] if key is not None else None
     if env:
         if text is None:
             text = state.src[text_start:text_end]
@@ -219,13 +218,11 @@ def find_link_range_end(src: str, label_start: int, close_pos: int, state: Inlin
             if not new_pos:
                 return None
             ref_label = label or src[label_start:close_pos]
-            ref_links = state.env.get("ref_links")
-            if ref_links and unikey(ref_label) in ref_links:
+            if find_ref_key(state.env, "ref_links", ref_label) is not None:
                 return new_pos
             return None
 
-    ref_links = state.env.get("ref_links")
-    if ref_links and unikey(src[label_start:close_pos]) in ref_links:
+    if find_ref_key(state.env, "ref_links", src[label_start:close_pos]) is not None:
         return end_pos
     return None
 
@@ -0,0 +1,124 @@
+"""Render many independent documents with a pool of worker processes."""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+from . import create_markdown
+
+if TYPE_CHECKING:
+    from .core import BaseRenderer
+    from .markdown import Markdown
+    from .plugins import PluginRef
+
+__all__ = ["RenderResult", "render_many"]
+
+
+@dataclass
+class RenderResult:
+    """The result of rendering one document. ``error`` is the exception
+    raised while rendering it, in this case ``output`` is ``None``."""
+
+    output: Union[str, List[Dict[str, Any]], None] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_worker_md: Optional["Markdown"] = None
+
+
+def render_many(
+    texts: Iterable[str],
+    *,
+    workers: Optional[int] = None,
+    escape: bool = True,
+    hard_wrap: bool = False,
+    renderer: Union[str, "BaseRenderer", None] = "html",
+    plugins: Optional[Iterable["PluginRef"]] = None,
+    chunksize: int = 1,
+) -> List[RenderResult]:
+    """Render the given markdown texts in worker processes. Every worker
+    creates the same ``Markdown`` instance with ``create_markdown`` from the
+    given options, which should be picklable::
+
+        from mistune.batch import render_many
+
+        results = render_many(texts, workers=4, plugins=['table', 'url'])
+        for result in results:
+            if result.ok:
+                save(result.output)
+
+    The results are in the same order of ``texts``. A document which fails
+    to render does not abort the batch, its exception is saved in the
+    ``error`` of the result.
+
+    :param texts: markdown texts
+    :param workers: number of processes, default is the number of CPUs
+    :param escape: Boolean. If using html renderer, escape html.
+    :param hard_wrap: Boolean. Break every new line into ``<br>``.
+    :param renderer: "html", "ast", "markdown", "rst" or a renderer instance
+    :param plugins: List of plugins.
+    :param chunksize: number of documents sent to a worker at a time
+    """
+    config: Dict[str, Any] = {
+        "escape": escape,
+        "hard_wrap": hard_wrap,
+        "renderer": renderer,
+        "plugins": list(plugins) if plugins is not None else None,
+    }
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        md = _create_markdown(config)
+        return [_render(md, text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as executor:
+        return list(executor.map(_render_in_worker, texts, chunksize=chunksize))
+
+
+def _create_markdown(config: Dict[str, Any]) -> "Markdown":
+    renderer = config["renderer"]
+    if renderer == "markdown":
+        from .renderers.markdown import MarkdownRenderer
+
+        renderer = MarkdownRenderer()
+    elif renderer == "rst":
+        from .renderers.rst import RSTRenderer
+
+        renderer = RSTRenderer()
+    return create_markdown(
+        escape=config["escape"],
+        hard_wrap=config["hard_wrap"],
+        renderer=renderer,
+        plugins=config["plugins"],
+    )
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    global _worker_md
+    _worker_md = _create_markdown(config)
+
+
+def _render_in_worker(text: str) -> RenderResult:
+    assert _worker_md is not None
+    result = _render(_worker_md, text)
+    if result.error is not None:
+        # the result is sent back to the parent process
+        try:
+            pickle.dumps(result.error)
+        except Exception:
+            result.error = RuntimeError(repr(result.error))
+    return result
+
+
+def _render(md: "Markdown", text: str) -> RenderResult:
+    try:
+        return RenderResult(output=md(text))
+    except Exception as exc:
+        return RenderResult(error=exc)
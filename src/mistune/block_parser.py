@@ -1,15 +1,17 @@
 import re
 import string
+from array import array
 from bisect import bisect_left
-from typing import List, Match, Optional, Pattern, Set, Tuple
+from typing import Any, Dict, List, Match, Optional, Pattern, Set, Tuple
 
-from .core import BlockState, Parser
+from .core import BlockState, Parser, RuleDispatcher
 from .helpers import (
     BLOCK_TAGS,
     HTML_ATTRIBUTES,
     HTML_TAGNAME,
     LINK_LABEL,
     PRE_TAGS,
+    get_class_chars,
     parse_link_href,
     parse_link_title,
     unescape_char,
@@ -107,6 +109,24 @@ class BlockParser(Parser[BlockState]):
         # register default parse methods
         self._methods = {name: getattr(self, "parse_" + name) for name in self.SPECIFICATION}
 
+    def get_start_chars(self, name: str) -> Optional[Set[str]]:
+        if name == "list" and name not in self.rule_start_chars:
+            # the list marker is a bullet or any unicode digit
+            return set(" \t*+-") | get_class_chars("d")
+        return super(BlockParser, self).get_start_chars(name)
+
+    def precompile(self) -> None:
+        """Compile the scanners of all rules, the list and block quote rules,
+        and the rule subsets used by the built-in rules ahead of time."""
+        super(BlockParser, self).precompile()
+        for rules in (self.list_rules, self.block_quote_rules):
+            if all(name in self.specification for name in rules):
+                self.compile_sc(rules)
+                self.get_dispatcher(rules).precompile()
+        self._precompile_rules(["thematic_break", "list"])
+        self._precompile_rules(["blank_line", "indent_code", "fenced_code"])
+        self._precompile_rules(["blank_line", "thematic_break", "fenced_code", "list", "block_html"])
+
     def parse_blank_line(self, m: Match[str], state: BlockState) -> int:
         """Parse token for blank lines."""
         state.append_token({"type": "blank_line"})
@@ -301,14 +321,19 @@ class BlockParser(Parser[BlockState]):
 
         state.cursor += len(state.get_line(state.cursor))
 
+        # collect the lines and join them once, instead of copying the
+        # growing text for every line
+        lines = [text]
+        length = len(text)
         end_pos: Optional[int] = None
         if require_marker:
             while state.cursor < state.cursor_max:
-                quote = _parse_block_quote_line(state.get_line(state.cursor))
+                line = state.get_line(state.cursor)
+                quote = _parse_block_quote_line(line)
                 if quote is None:
                     break
-                text += quote
-                state.cursor += len(state.get_line(state.cursor))
+                lines.append(quote)
+                state.cursor += len(line)
         else:
             prev_blank_line = False
             break_sc = self.compile_sc(
@@ -321,10 +346,12 @@ class BlockParser(Parser[BlockState]):
                 ]
             )
             while state.cursor < state.cursor_max:
-                quote = _parse_block_quote_line(state.get_line(state.cursor))
+                line = state.get_line(state.cursor)
+                quote = _parse_block_quote_line(line)
                 if quote is not None:
-                    text += quote
-                    state.cursor += len(state.get_line(state.cursor))
+                    lines.append(quote)
+                    length += len(quote)
+                    state.cursor += len(line)
                     if not quote.strip():
                         prev_blank_line = True
                     else:
@@ -345,13 +372,15 @@ class BlockParser(Parser[BlockState]):
 
                 # lazy continuation line
                 line = state.get_line(state.cursor)
-                lazy_line_starts.add(len(text))
-                text += expand_leading_tab(line, 3)
+                lazy_line_starts.add(length)
+                lazy_line = expand_leading_tab(line, 3)
+                lines.append(lazy_line)
+                length += len(lazy_line)
                 state.cursor += len(line)
 
         # according to CommonMark Example 6, the second tab should be
         # treated as 4 spaces
-        return expand_tab(text), end_pos, lazy_line_starts
+        return expand_tab("".join(lines)), end_pos, lazy_line_starts
 
     def parse_block_quote(self, m: Match[str], state: BlockState) -> int:
         """Parse token for block quote. Here is an example of the syntax:
@@ -439,11 +468,18 @@ class BlockParser(Parser[BlockState]):
         return None
 
     def parse(self, state: BlockState, rules: Optional[List[str]] = None) -> None:
-        sc = self.compile_sc(rules)
+        dispatcher = self.get_dispatcher(rules)
+        sc = dispatcher.sc
+        match = dispatcher.match
+
+        # a blank line ends every top level block, the positions after
+        # blank lines are where an incremental re-parse can restart
+        record_sync = state.parent is None
+        syncs: List[Tuple[int, int, Dict[str, Any]]] = []
 
         while state.cursor < state.cursor_max:
-            m = sc.match(state.src, state.cursor)
-            if not m and self._parse_plain_paragraph(state, sc):
+            m = match(state.src, state.cursor)
+            if not m and self._parse_plain_paragraph(state, dispatcher):
                 continue
 
             if not m:
@@ -460,6 +496,8 @@ class BlockParser(Parser[BlockState]):
             end_pos2 = self.parse_method(m, state)
             if end_pos2:
                 state.cursor = end_pos2
+                if record_sync and state.tokens and state.tokens[-1]["type"] == "blank_line":
+                    syncs.append((end_pos2, len(state.tokens), state.tokens[-1]))
             else:
                 end_pos3 = state.find_line_end()
                 text = state.get_text(end_pos3)
@@ -471,20 +509,137 @@ class BlockParser(Parser[BlockState]):
             state.add_paragraph(text)
             state.cursor = state.cursor_max
 
-    def _parse_plain_paragraph(self, state: BlockState, sc: Pattern[str]) -> bool:
+        if record_sync:
+            # rules like def_list may replace the tokens before a blank line
+            tokens = state.tokens
+            state.sync_points = [
+                (pos, index) for pos, index, tok in syncs if index <= len(tokens) and tokens[index - 1] is tok
+            ]
+
+    def reparse(self, state: BlockState, start: int, end: int, text: str) -> Optional[BlockState]:
+        """Parse ``state.src`` with ``src[start:end]`` replaced by ``text``,
+        reusing the top level tokens of ``state`` outside of the edited
+        blocks. The new state shares ``state.env`` and the reused tokens.
+
+        It returns ``None`` when the edit can not be parsed incrementally,
+        e.g. the re-parsed region adds or removes definitions, in this
+        case the whole document should be parsed again.
+        """
+        old_src = state.src
+        new_src = old_src[:start] + text + old_src[end:]
+        if not new_src.endswith("\n"):
+            new_src += "\n"
+        delta = len(text) - (end - start)
+
+        syncs = state.sync_points
+        positions = [pos for pos, _ in syncs]
+
+        # the region starts one sync point earlier than the edit, so that
+        # the sync point right before the edit can be checked again
+        i = bisect_left(positions, start)
+        if i > 1:
+            region_start, region_index = syncs[i - 2]
+        else:
+            region_start, region_index = 0, 0
+
+        j = bisect_left(positions, end)
+        step = 1
+        while True:
+            k = j + step
+            if k < len(syncs):
+                old_region_end = positions[k]
+                src = new_src[region_start : old_region_end + delta]
+            else:
+                old_region_end = len(old_src)
+                src = new_src[region_start:]
+
+            child = self._parse_region(state, src)
+            if child is None:
+                return None
+
+            head = _find_region_head(state, child, syncs[:i], region_start, region_index)
+            if head is None:
+                return None
+
+            # the first sync point after the edit which is found in both
+            # parse results, the tokens after it are not changed
+            tail = None
+            for pos, index in child.sync_points:
+                new_pos = region_start + pos
+                if new_pos - delta >= end and pos < len(src):
+                    old_index = _find_sync_index(syncs, positions, new_pos - delta)
+                    if old_index is not None:
+                        tail = (pos, index, old_index)
+                        break
+
+            if tail is not None or k >= len(syncs):
+                break
+            step *= 2
+
+        at_end = tail is None
+        if tail is None:
+            tail = (len(src) + 1, len(child.tokens), len(state.tokens))
+            old_region_end = len(old_src)
+
+        if self._parse_region(state, old_src[region_start:old_region_end]) is None:
+            return None
+
+        head_pos, head_index, old_head_index = head
+        tail_pos, tail_index, old_tail_index = tail
+        tokens = state.tokens[:old_head_index]
+        tokens.extend(child.tokens[head_index:tail_index])
+        offset = old_head_index - head_index
+        sync_points = syncs[: bisect_left(positions, region_start + head_pos + 1)]
+        sync_points.extend(
+            (region_start + pos, index + offset) for pos, index in child.sync_points if head_pos < pos < tail_pos
+        )
+
+        if not at_end:
+            offset = len(tokens) - old_tail_index
+            tokens.extend(state.tokens[old_tail_index:])
+            old_tail_pos = region_start + tail_pos - delta
+            sync_points.extend(
+                (pos + delta, index + offset) for pos, index in syncs[bisect_left(positions, old_tail_pos) :]
+            )
+
+        new_state = self.state_cls()
+        new_state.process(new_src)
+        new_state.cursor = new_state.cursor_max
+        new_state.tokens = tokens
+        new_state.sync_points = sync_points
+        new_state.env = state.env
+        return new_state
+
+    def _parse_region(self, state: BlockState, src: str) -> Optional[BlockState]:
+        child = self.state_cls()
+        child.env = {key: value for key, value in state.env.items() if key.startswith("__")}
+        child.env["ref_links"] = {}
+        child.process(src)
+        self.parse(child)
+
+        # definitions are shared by the whole document
+        for key, value in child.env.items():
+            if key == "ref_links" and value or not key.startswith("__") and key != "ref_links":
+                return None
+        return child
+
+    def _parse_plain_paragraph(self, state: BlockState, dispatcher: RuleDispatcher) -> bool:
         if not _is_plain_paragraph_start(state.src, state.cursor):
             return False
 
-        pos = state.cursor
-        while pos < state.cursor_max:
-            if pos > state.cursor and sc.match(state.src, pos):
-                break
+        if dispatcher.interrupter is not None:
+            pos = _find_paragraph_end(state, dispatcher)
+        else:
+            pos = state.cursor
+            while pos < state.cursor_max:
+                if pos > state.cursor and dispatcher.match(state.src, pos):
+                    break
 
-            line = state.get_line(pos)
-            if not line.strip():
-                break
+                line = state.get_line(pos)
+                if not line.strip():
+                    break
 
-            pos += len(line)
+                pos += len(line)
 
         if pos <= state.cursor:
             return False
@@ -494,6 +649,54 @@ class BlockParser(Parser[BlockState]):
         return True
 
 
+def _find_paragraph_end(state: BlockState, dispatcher: RuleDispatcher) -> int:
+    """Find the start of the first line which may interrupt the paragraph,
+    only the lines found by the interrupter pattern are checked."""
+    src = state.src
+    end = state.cursor_max
+    interrupter = dispatcher.interrupter
+    assert interrupter is not None
+
+    pos = state.cursor
+    while True:
+        m = interrupter.search(src, pos, end)
+        if not m:
+            return end
+        pos = m.end()
+        if dispatcher.match(src, pos) or not state.get_line(pos).strip():
+            return pos
+
+
+def _find_sync_index(syncs: List[Tuple[int, int]], positions: List[int], pos: int) -> Optional[int]:
+    i = bisect_left(positions, pos)
+    if i < len(positions) and positions[i] == pos:
+        return syncs[i][1]
+    return None
+
+
+def _find_region_head(
+    state: BlockState,
+    child: BlockState,
+    syncs: List[Tuple[int, int]],
+    region_start: int,
+    region_index: int,
+) -> Optional[Tuple[int, int, int]]:
+    if region_start == 0:
+        return 0, 0, 0
+
+    # the last sync point before the edit, it is trusted only when the
+    # region is parsed into the same top level blocks before it
+    pos, old_index = syncs[-1]
+    for child_pos, index in child.sync_points:
+        if region_start + child_pos == pos:
+            types = [tok["type"] for tok in child.tokens[:index]]
+            old_types = [tok["type"] for tok in state.tokens[region_index:old_index]]
+            if types == old_types:
+                return child_pos, index, old_index
+            return None
+    return None
+
+
 def _parse_html_to_end(state: BlockState, end_marker: str, start_pos: int) -> int:
     marker_pos = state.src.find(end_marker, start_pos)
     if marker_pos == -1:
@@ -531,12 +734,11 @@ def _parse_block_quote_line(line: str) -> Optional[str]:
 
 
 def _find_next_blank_line(state: BlockState, pos: int, pattern: Pattern[str]) -> Optional[int]:
-    cache = state.env.get("__blank_line_starts__")
-    if cache is None or cache[0] is not state.src:
-        cache = (state.src, [m.start() for m in pattern.finditer(state.src)])
-        state.env["__blank_line_starts__"] = cache
+    positions = state.blank_line_starts
+    if positions is None:
+        positions = array("l", [m.start() for m in pattern.finditer(state.src)])
+        state.blank_line_starts = positions
 
-    positions = cache[1]
     index = bisect_left(positions, pos)
     if index < len(positions):
         return positions[index]
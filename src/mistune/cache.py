@@ -0,0 +1,312 @@
+"""Cache the results of ``Markdown.parse`` by the content of the source."""
+
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Protocol, Tuple, Union
+
+if TYPE_CHECKING:
+    from .core import BlockState
+    from .markdown import Markdown
+
+__all__ = ["CacheBackend", "MemoryBackend", "DirectoryBackend", "RenderCache"]
+
+_PRIMITIVE_TYPES = (bool, int, float, str, type(None))
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """Keep at most ``maxsize`` cached items in memory, the least recently
+    used item is evicted at first."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DirectoryBackend:
+    """Save cached items as files in the given directory. The files are
+    evicted in batches: once there are 10% more files than ``maxsize``,
+    the least recently used files are removed until ``maxsize`` files are
+    left. The file modification time is updated on read.
+
+    The cached items are loaded with ``pickle``, the directory must be
+    trusted: only the service using the cache should be able to write
+    into it.
+    """
+
+    SUFFIX = ".mdcache"
+
+    def __init__(self, path: str, maxsize: int = 1024):
+        self.path = path
+        self.maxsize = maxsize
+        # the number of files written before the directory is listed again
+        self.margin = max(maxsize // 10, 1)
+        # an estimate of the number of files, other processes may write
+        # into the same directory
+        self._count: Optional[int] = None
+        os.makedirs(path, exist_ok=True)
+
+    def _filepath(self, key: str) -> str:
+        return os.path.join(self.path, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[bytes]:
+        filepath = self._filepath(key)
+        try:
+            with open(filepath, "rb") as f:
+                value = f.read()
+            os.utime(filepath)
+        except OSError:
+            return None
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, self._filepath(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if self._count is None:
+            self._count = len(self._list_files())
+        else:
+            self._count += 1
+        if self._count > self.maxsize + self.margin:
+            self._evict()
+
+    def clear(self) -> None:
+        for filepath in self._list_files():
+            _remove_file(filepath)
+        self._count = 0
+
+    def _list_files(self) -> List[str]:
+        return [entry.path for entry in os.scandir(self.path) if entry.name.endswith(self.SUFFIX)]
+
+    def _evict(self) -> None:
+        files = self._list_files()
+        self._count = min(len(files), self.maxsize)
+        if len(files) <= self.maxsize:
+            return
+
+        mtimes = []
+        for filepath in files:
+            try:
+                mtimes.append((os.path.getmtime(filepath), filepath))
+            except OSError:
+                pass
+        mtimes.sort()
+        for _, filepath in mtimes[: len(mtimes) - self.maxsize]:
+            _remove_file(filepath)
+
+    def __len__(self) -> int:
+        return len(self._list_files())
+
+
+class RenderCache:
+    """Cache the results of ``Markdown.parse``. The cache key is the hash
+    of the source text and the configuration of the ``Markdown`` instance,
+    e.g. the rules of the parsers, the hooks and the renderer::
+
+        import mistune
+        from mistune.cache import RenderCache
+
+        md = mistune.create_markdown(plugins=['table'])
+        cached_md = RenderCache(md, maxsize=512)
+        html = cached_md(text)
+
+    Every call returns a new copy of the tokens and ``state.env``, they
+    can be modified safely.
+
+    :param md: Markdown instance
+    :param backend: a cache backend, default is ``MemoryBackend``
+    :param maxsize: the max size of the default ``MemoryBackend``
+    """
+
+    def __init__(self, md: "Markdown", backend: Optional[CacheBackend] = None, maxsize: int = 128):
+        if backend is None:
+            backend = MemoryBackend(maxsize)
+        self.md = md
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._fingerprint = b""
+
+    def parse(self, s: str) -> Tuple[Union[str, List[Dict[str, Any]]], "BlockState"]:
+        """Parse and convert the given markdown string, the same as
+        ``Markdown.parse``.
+
+        :param s: markdown string
+        :returns: result, state
+        """
+        key = self.cache_key(s)
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return self._load(value)
+
+        with self._lock:
+            self.misses += 1
+
+        result, state = self.md.parse(s)
+        env = {k: v for k, v in state.env.items() if not k.startswith("__")}
+        try:
+            value = pickle.dumps((result, state.src, state.tokens, state.sync_points, env), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # the tokens or env contain objects which can not be cached
+            return result, state
+
+        self.backend.set(key, value)
+        return result, state
+
+    def cache_key(self, s: str) -> str:
+        md = self.md
+        # the full fingerprint is only computed again when rules, hooks or
+        # options have been changed, e.g. a new plugin is used
+        signature = (
+            tuple(md.block.rules),
+            tuple(md.inline.rules),
+            tuple(md.before_parse_hooks),
+            tuple(md.before_render_hooks),
+            tuple(md.after_render_hooks),
+            md.renderer,
+            _option_values(md.block),
+            _option_values(md.inline),
+            _option_values(md.renderer),
+        )
+        if signature != self._signature:
+            self._signature = signature
+            self._fingerprint = self.fingerprint().encode("utf-8")
+
+        h = hashlib.sha256(self._fingerprint)
+        h.update(b"\0")
+        h.update(s.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def fingerprint(self) -> str:
+        """A description of the configuration of the ``Markdown`` instance,
+        registering a new plugin changes the fingerprint."""
+        from . import __version__
+
+        md = self.md
+        hooks: List[List[Callable[..., Any]]] = [md.before_parse_hooks, md.before_render_hooks, md.after_render_hooks]
+        config = (
+            __version__,
+            _describe(md.block),
+            _describe(md.inline),
+            _describe(md.renderer, private_options=True),
+            [[_qualname(hook) for hook in funcs] for funcs in hooks],
+        )
+        return repr(config)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _load(self, value: bytes) -> Tuple[Union[str, List[Dict[str, Any]]], "BlockState"]:
+        result, src, tokens, sync_points, env = pickle.loads(value)
+        state = self.md.block.state_cls()
+        state.process(src)
+        state.cursor = state.cursor_max
+        state.tokens = tokens
+        state.sync_points = sync_points
+        state.env = env
+        return result, state
+
+    def __call__(self, s: str) -> Union[str, List[Dict[str, Any]]]:
+        if s is None:
+            s = "\n"
+        return self.parse(s)[0]
+
+
+def _qualname(obj: Any) -> str:
+    if isinstance(obj, functools.partial):
+        return _qualname(obj.func)
+    if not isinstance(obj, type) and not hasattr(obj, "__qualname__"):
+        obj = obj.__class__
+    return getattr(obj, "__module__", "") + "." + getattr(obj, "__qualname__", repr(obj))
+
+
+def _option_values(obj: Any) -> Tuple[Any, ...]:
+    if obj is None:
+        return ()
+    values: List[Tuple[str, Any]] = []
+    for key, value in vars(obj).items():
+        if isinstance(value, _PRIMITIVE_TYPES):
+            values.append((key, value))
+        elif isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+            values.append((key, tuple(value)))
+    return tuple(values)
+
+
+def _describe(obj: Any, private_options: bool = False) -> Any:
+    if obj is None:
+        return None
+
+    # parsers keep lazy caches in private attributes, while the options
+    # of renderers (e.g. ``_escape``) are private attributes
+    config: List[Any] = [_qualname(obj.__class__)]
+    for key, value in sorted(vars(obj).items()):
+        if key.endswith("methods") and isinstance(value, dict):
+            config.append((key, sorted((str(k), _qualname(v)) for k, v in value.items())))
+        elif key.startswith("_") and not private_options:
+            continue
+        elif key.endswith("_cache"):
+            # memoized results, e.g. ``_safe_url_cache`` of renderers
+            continue
+        elif isinstance(value, _PRIMITIVE_TYPES):
+            config.append((key, value))
+        elif isinstance(value, (list, tuple, set, frozenset)) and all(isinstance(v, str) for v in value):
+            config.append((key, sorted(value) if isinstance(value, (set, frozenset)) else tuple(value)))
+        elif isinstance(value, dict) and value and all(isinstance(v, str) for v in value.values()):
+            # rule specifications
+            config.append((key, sorted(value.items())))
+    return config
+
+
+def _remove_file(filepath: str) -> None:
+    try:
+        os.remove(filepath)
+    except OSError:
+        pass
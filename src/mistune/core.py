@@ -1,5 +1,7 @@
 import re
 import sys
+from array import array
+from functools import partial
 from typing import (
     Any,
     Callable,
@@ -20,13 +22,13 @@ from typing import (
     cast,
 )
 
+from .helpers import char_class_pattern, guess_start_chars
+
 if sys.version_info >= (3, 11):
     from typing import Self
 else:
     from typing_extensions import Self
 
-_LINE_END = re.compile(r"\n|$")
-
 
 class BlockState:
     """The state to save block parser's cursor and tokens."""
@@ -39,6 +41,8 @@ class BlockState:
     parent: Any
     env: MutableMapping[str, Any]
     lazy_line_starts: Set[int]
+    sync_points: List[Tuple[int, int]]
+    blank_line_starts: Optional["array[int]"]
 
     def __init__(self, parent: Optional[Any] = None) -> None:
         self.src = ""
@@ -53,6 +57,13 @@ class BlockState:
         self.parent = parent
         self.lazy_line_starts = set()
 
+        # (position, token index) pairs where the top level parser can
+        # restart, they are used by ``BlockParser.reparse``
+        self.sync_points = []
+
+        # lazy index of the blank lines in ``src``
+        self.blank_line_starts = None
+
         # for saving def references
         if parent:
             self.env = parent.env
@@ -69,14 +80,16 @@ class BlockState:
     def process(self, src: str) -> None:
         self.src = src
         self.cursor_max = len(src)
+        self.blank_line_starts = None
 
     def find_line_end(self) -> int:
         return self.find_line_end_at(self.cursor)
 
     def find_line_end_at(self, pos: int) -> int:
-        m = _LINE_END.search(self.src, pos)
-        assert m is not None
-        return m.end()
+        end_pos = self.src.find("\n", pos)
+        if end_pos == -1:
+            return len(self.src)
+        return end_pos + 1
 
     def get_text(self, end_pos: int) -> str:
         return self.src[self.cursor : end_pos]
@@ -137,6 +150,22 @@ class InlineState:
         self.link_ranges: Dict[int, Tuple[str, List[int], List[int]]] = {}
         self.formatting_no_end: Dict[Tuple[int, str], Tuple[str, int]] = {}
 
+    def reset(self, env: MutableMapping[str, Any], src: str = "") -> None:
+        """Reset the state to parse a new source, the state can be reused
+        without allocating a new one."""
+        self.env = env
+        self.src = src
+        self.tokens = []
+        self.in_image = False
+        self.image_depth = 0
+        self.in_link = False
+        self.no_close_bracket_before = 0
+        self.no_link_before = 0
+        self.no_image_before = 0
+        self.link_brackets.clear()
+        self.link_ranges.clear()
+        self.formatting_no_end.clear()
+
     def prepend_token(self, token: Dict[str, Any]) -> None:
         """Insert token before the last token."""
         self.tokens.insert(len(self.tokens) - 1, token)
@@ -160,6 +189,69 @@ class InlineState:
 ST = TypeVar("ST", InlineState, BlockState)
 
 
+class RuleDispatcher(object):
+    """A table from the character at the cursor to the scanner of the
+    rules which can start with it. A rule whose start characters are
+    unknown is tried for every character::
+
+        dispatcher = parser.get_dispatcher()
+        m = dispatcher.match(src, pos)  # the same as parser.compile_sc().match
+
+    :param parser: the parser of the rules
+    :param rules: names of the rules
+    """
+
+    def __init__(self, parser: "Parser[Any]", rules: List[str]):
+        self.parser = parser
+        self.rules = rules
+        self.sc = parser.compile_sc(rules)
+        self.start_chars = [parser.get_start_chars(name) for name in rules]
+        self._table: Dict[str, Optional[Pattern[str]]] = {}
+
+        # a line can only be the start of a rule when it starts with one
+        # of the start characters, or when it is a blank line
+        self.interrupter: Optional[Pattern[str]] = None
+        chars: Set[str] = set()
+        for start_chars in self.start_chars:
+            if start_chars is None:
+                break
+            chars.update(start_chars)
+        else:
+            self.interrupter = re.compile(r"\n(?=[\s" + char_class_pattern(chars) + "])")
+
+    def precompile(self) -> None:
+        """Compile the scanners of all the start characters ahead of time,
+        and the scanner of other characters."""
+        chars: Set[str] = {""}
+        for start_chars in self.start_chars:
+            if start_chars is not None:
+                chars.update(start_chars)
+        for c in chars:
+            if c not in self._table:
+                self._compile(c)
+
+    def match(self, src: str, pos: int) -> Optional[Match[str]]:
+        c = src[pos] if pos < len(src) else ""
+        try:
+            sc = self._table[c]
+        except KeyError:
+            sc = self._compile(c)
+        if sc is None:
+            return None
+        return sc.match(src, pos)
+
+    def _compile(self, c: str) -> Optional[Pattern[str]]:
+        rules = [name for name, chars in zip(self.rules, self.start_chars) if chars is None or c in chars]
+        if len(rules) == len(self.rules):
+            sc: Optional[Pattern[str]] = self.sc
+        elif rules:
+            sc = self.parser.compile_sc(rules)
+        else:
+            sc = None
+        self._table[c] = sc
+        return sc
+
+
 class Parser(Generic[ST]):
     sc_flag: "re._FlagsType" = re.M
     state_cls: Type[ST]
@@ -176,6 +268,17 @@ class Parser(Generic[ST]):
         ] = {}
 
         self.__sc: Dict[str, Pattern[str]] = {}
+        self.__dispatchers: Dict[Tuple[str, ...], RuleDispatcher] = {}
+        #: the declared start characters of rules
+        self.rule_start_chars: Dict[str, Set[str]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the compiled scanners are not pickled, compiling them on demand
+        # is faster than loading all of them
+        state = self.__dict__.copy()
+        state["_Parser__sc"] = {}
+        state["_Parser__dispatchers"] = {}
+        return state
 
     def compile_sc(self, rules: Optional[List[str]] = None) -> Pattern[str]:
         if rules is None:
@@ -193,12 +296,54 @@ class Parser(Generic[ST]):
         self.__sc[key] = sc
         return sc
 
+    def get_start_chars(self, name: str) -> Optional[Set[str]]:
+        """Get the characters which the rule of ``name`` can start with,
+        ``None`` means the rule can start with any character."""
+        chars = self.rule_start_chars.get(name)
+        if chars is not None:
+            return chars
+        pattern = self.specification.get(name)
+        if not pattern:
+            return set()
+        return guess_start_chars(pattern)
+
+    def get_dispatcher(self, rules: Optional[List[str]] = None) -> RuleDispatcher:
+        """Get the dispatcher of the given rules, it only tries the rules
+        which can start with the character at the cursor."""
+        key = tuple(self.rules if rules is None else rules)
+        dispatcher = self.__dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = RuleDispatcher(self, list(key))
+            self.__dispatchers[key] = dispatcher
+        return dispatcher
+
+    def fast_path_blockers(self) -> List[str]:
+        """Get the names of the rules whose start characters are unknown.
+        These rules have to be tried at every position, which disables the
+        fast text skipping of the inline parser and the paragraph scan of
+        the block parser. Pass ``start_chars`` to ``register`` to fix it::
+
+            md.inline.fast_path_blockers()  # => ['my_rule']
+        """
+        return [name for name in self.rules if self.get_start_chars(name) is None]
+
+    def precompile(self) -> None:
+        """Compile the scanner of all rules and the dispatcher of them
+        ahead of time."""
+        self.compile_sc()
+        self.get_dispatcher().precompile()
+
+    def _precompile_rules(self, rules: List[str]) -> None:
+        if all(name in self.specification for name in rules):
+            self.compile_sc(rules)
+
     def register(
         self,
         name: str,
         pattern: Union[str, None],
         func: Callable[[Self, Match[str], ST], Optional[int]],
         before: Optional[str] = None,
+        start_chars: Optional[Iterable[str]] = None,
     ) -> None:
         """Register a new rule to parse the token. This method is usually used to
         create a new plugin.
@@ -207,9 +352,17 @@ class Parser(Generic[ST]):
         :param pattern: regex pattern in string
         :param func: the parsing function
         :param before: insert this rule before a built-in rule
+        :param start_chars: characters the rule can start with, e.g. ``"~"``,
+                            it is guessed from the pattern by default
         """
-        self._methods[name] = lambda m, state: func(self, m, state)
+        # partial keeps the parser picklable
+        self._methods[name] = partial(func, self)
         self.__sc.clear()
+        self.__dispatchers.clear()
+        if start_chars is not None:
+            self.rule_start_chars[name] = set(start_chars)
+        elif pattern:
+            self.rule_start_chars.pop(name, None)
         if pattern:
             self.specification[name] = pattern
         if name not in self.rules:
@@ -241,6 +394,13 @@ class BaseRenderer(object):
 
     def __init__(self) -> None:
         self.__methods: Dict[str, Callable[..., str]] = {}
+        # token type => render method, filled on the first lookup
+        self.__dispatch: Dict[str, Callable[..., str]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_BaseRenderer__dispatch"] = {}
+        return state
 
     def register(self, name: str, method: Callable[..., str]) -> None:
         """Register a render method for the named token. For example::
@@ -251,16 +411,22 @@ class BaseRenderer(object):
         renderer.register('wiki', render_wiki)
         """
         # bind self into renderer method
-        self.__methods[name] = lambda *arg, **kwargs: method(self, *arg, **kwargs)
+        self.__methods[name] = partial(method, self)
+        self.__dispatch.clear()
 
     def _get_method(self, name: str) -> Callable[..., str]:
+        method = self.__dispatch.get(name)
+        if method is not None:
+            return method
+
         try:
-            return cast(Callable[..., str], object.__getattribute__(self, name))
+            method = cast(Callable[..., str], object.__getattribute__(self, name))
         except AttributeError:
             method = self.__methods.get(name)
             if not method:
                 raise AttributeError('No renderer "{!r}"'.format(name))
-            return method
+        self.__dispatch[name] = method
+        return method
 
     def render_token(self, token: Dict[str, Any], state: BlockState) -> str:
         func = self._get_method(token["type"])
@@ -273,5 +439,20 @@ class BaseRenderer(object):
     def render_tokens(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> str:
         return "".join(self.iter_tokens(tokens, state))
 
+    def render_into(self, tokens: Iterable[Dict[str, Any]], state: BlockState, write: Callable[[str], Any]) -> None:
+        """Render the tokens and pass the output to ``write`` piece by piece,
+        e.g. ``fp.write`` of a file or ``append`` of a list. The output is
+        the same as ``__call__``, but it is not joined into one string::
+
+            buf = io.StringIO()
+            renderer.render_into(tokens, state, buf.write)
+        """
+        if type(self).render_tokens is not BaseRenderer.render_tokens:
+            # the customized method may change the joined output
+            write(self.render_tokens(tokens, state))
+            return
+        for chunk in self.iter_tokens(tokens, state):
+            write(chunk)
+
     def __call__(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> str:
         return self.render_tokens(tokens, state)
@@ -1,8 +1,10 @@
 import re
 import string
-from typing import Any, Dict, Tuple, Union
+import sys
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, MutableMapping, Optional, Set, Tuple, Union, cast
 
-from .util import escape_url
+from .util import escape_url, unikey
 
 PREVENT_BACKSLASH = r"(?<!\\)(?:\\\\)*"
 PUNCTUATION = r"[" + re.escape(string.punctuation) + r"]"
@@ -273,3 +275,287 @@ def _parse_angle_link_href(src: str, pos: int) -> Union[Tuple[str, int], Tuple[N
             return None, None
         pos += 1
     return None, None
+
+
+def find_ref_key(env: MutableMapping[str, Any], name: str, label: str) -> Optional[str]:
+    """Find the key of ``label`` in the definitions ``env[name]``, e.g.
+    ``ref_links`` or ``ref_footnotes``. It returns ``None`` if the label is
+    not defined::
+
+        key = find_ref_key(state.env, 'ref_links', 'Foo  Bar')  # => 'FOO BAR'
+
+    The normalized keys of labels are memoized in ``env``, a label whose
+    first character does not start any definition is not normalized.
+    """
+    refs = env.get(name)
+    if not refs:
+        return None
+
+    keys: Optional[Dict[str, str]] = env.get("__ref_keys")
+    if keys is None:
+        keys = {}
+        env["__ref_keys"] = keys
+
+    key = keys.get(label)
+    if key is None:
+        first = label.lstrip()[:1].lower().upper()[:1]
+        if not first or first not in _get_ref_first_chars(env, name, refs):
+            return None
+        key = unikey(label)
+        keys[label] = key
+
+    if key in refs:
+        return key
+    return None
+
+
+def _get_ref_first_chars(env: MutableMapping[str, Any], name: str, refs: Dict[str, Any]) -> Set[str]:
+    # definitions may be added while parsing, the index is created again
+    # when the number of definitions changes
+    cache_key = "__ref_first_chars_" + name
+    cached = env.get(cache_key)
+    if cached is not None and cached[0] is refs and cached[1] == len(refs):
+        return cast(Set[str], cached[2])
+
+    chars = {key[:1] for key in refs}
+    env[cache_key] = (refs, len(refs), chars)
+    return chars
+
+
+_ESCAPED_CHARS = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+_HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+_MAX_RANGE_SIZE = 1024
+# the unicode-aware classes which can be enumerated, e.g. "\d" matches "١"
+_CLASS_NAMES = "ds"
+_CLASS_CHARS: Dict[str, FrozenSet[str]] = {}
+_QUANTIFIER_RE = re.compile(r"\{(\d*)(?:,(\d*))?\}")
+
+
+def guess_start_chars(pattern: str) -> Optional[Set[str]]:
+    """Guess the characters which a match of the regex ``pattern`` can
+    start with. It returns ``None`` if the pattern can start with any
+    character, or if the pattern is too complex to be analyzed::
+
+        guess_start_chars(r"^ {0,3}#{1,6}")  # => {' ', '#'}
+        guess_start_chars(r"[*_]{1,3}")  # => {'*', '_'}
+    """
+    try:
+        chars, nullable, pos = _guess_alternation(pattern, 0)
+    except (ValueError, IndexError):
+        return None
+    if chars is None or nullable or pos != len(pattern):
+        return None
+    for name in _CLASS_NAMES:
+        if "\\" + name in chars:
+            chars.remove("\\" + name)
+            chars |= get_class_chars(name)
+    return chars
+
+
+def get_class_chars(name: str) -> FrozenSet[str]:
+    """Get the characters matched by the regex class ``\\d`` or ``\\s``.
+    They are enumerated over the unicode range on the first call::
+
+        "\\u0661" in get_class_chars("d")  # => True
+    """
+    chars = _CLASS_CHARS.get(name)
+    if chars is None:
+        if name == "d":
+            chars = frozenset(_iter_decimal_chars())
+        else:
+            chars = frozenset(filter(str.isspace, map(chr, range(sys.maxunicode + 1))))
+        _CLASS_CHARS[name] = chars
+    return chars
+
+
+def char_class_pattern(chars: Iterable[str]) -> str:
+    """Create the body of a regex character class which matches ``chars``.
+    The runs of characters are merged into ranges, since a large class of
+    single characters is slow to match::
+
+        char_class_pattern("0123456789-")  # => '\\-0-9'
+    """
+    codes = sorted(set(map(ord, chars)))
+    parts = []
+    i = 0
+    while i < len(codes):
+        j = i
+        while j + 1 < len(codes) and codes[j + 1] == codes[j] + 1:
+            j += 1
+        part = re.escape(chr(codes[i]))
+        if j > i:
+            part += "-" + re.escape(chr(codes[j]))
+        parts.append(part)
+        i = j + 1
+    return "".join(parts)
+
+
+def _iter_decimal_chars() -> Iterator[str]:
+    # decimal digits are encoded in runs from zero to nine, so every run
+    # contains one of the code points at a step of ten
+    for c in map(chr, range(0, sys.maxunicode + 1, 10)):
+        if c.isdecimal():
+            start = ord(c) - unicodedata.decimal(c)
+            yield from map(chr, range(start, start + 10))
+
+
+def _guess_alternation(pattern: str, pos: int) -> Tuple[Optional[Set[str]], bool, int]:
+    chars: Optional[Set[str]] = set()
+    nullable = False
+    # the first characters of the current branch
+    branch: Optional[Set[str]] = set()
+    branch_nullable = True
+
+    while pos < len(pattern) and pattern[pos] != ")":
+        if pattern[pos] == "|":
+            chars = None if chars is None or branch is None else chars | branch
+            nullable = nullable or branch_nullable
+            branch = set()
+            branch_nullable = True
+            pos += 1
+            continue
+
+        item, item_nullable, pos = _guess_item(pattern, pos)
+        optional, pos = _parse_quantifier(pattern, pos)
+        if branch_nullable:
+            branch = None if branch is None or item is None else branch | item
+            branch_nullable = item_nullable or optional
+
+    chars = None if chars is None or branch is None else chars | branch
+    return chars, nullable or branch_nullable, pos
+
+
+def _guess_item(pattern: str, pos: int) -> Tuple[Optional[Set[str]], bool, int]:
+    c = pattern[pos]
+    if c in "^$":
+        return set(), True, pos + 1
+    if c == ".":
+        return None, False, pos + 1
+    if c == "\\":
+        return _guess_escape(pattern, pos + 1)
+    if c == "[":
+        return _guess_char_class(pattern, pos + 1)
+    if c == "(":
+        return _guess_group(pattern, pos)
+    if c in "*+?{)|":
+        raise ValueError(pattern)
+    return {c}, False, pos + 1
+
+
+def _guess_escape(pattern: str, pos: int) -> Tuple[Optional[Set[str]], bool, int]:
+    c = pattern[pos]
+    pos += 1
+    if c in "bBAZ":
+        return set(), True, pos
+    if c in _CLASS_NAMES:
+        # a placeholder of the class, it is only expanded by guess_start_chars
+        # when the class is at the start, since enumerating it is slow
+        return {"\\" + c}, False, pos
+    if c in "DSwW":
+        return None, False, pos
+    if c in _ESCAPED_CHARS:
+        return {_ESCAPED_CHARS[c]}, False, pos
+    if c in _HEX_ESCAPES:
+        size = _HEX_ESCAPES[c]
+        code = pattern[pos : pos + size]
+        if len(code) != size:
+            raise ValueError(pattern)
+        return {chr(int(code, 16))}, False, pos + size
+    if c == "N" or c.isdigit():
+        raise ValueError(pattern)
+    return {c}, False, pos
+
+
+def _guess_char_class(pattern: str, pos: int) -> Tuple[Optional[Set[str]], bool, int]:
+    negated = pattern[pos] == "^"
+    if negated:
+        pos += 1
+
+    chars: Optional[Set[str]] = set()
+    start = pos
+    while pattern[pos] != "]" or pos == start:
+        item, pos = _guess_class_item(pattern, pos)
+        if item and len(item) == 1 and pattern[pos] == "-" and pattern[pos + 1] != "]":
+            last, pos = _guess_class_item(pattern, pos + 1)
+            if not last or len(last) != 1 or len(min(item)) != 1 or len(min(last)) != 1:
+                # a range of a class placeholder, e.g. [\d-z]
+                raise ValueError(pattern)
+            first_code, last_code = ord(min(item)), ord(min(last))
+            if last_code - first_code > _MAX_RANGE_SIZE:
+                item = None
+            else:
+                item = {chr(i) for i in range(first_code, last_code + 1)}
+
+        if item is None or chars is None:
+            chars = None
+        else:
+            chars |= item
+
+    if negated:
+        return None, False, pos + 1
+    return chars, False, pos + 1
+
+
+def _guess_class_item(pattern: str, pos: int) -> Tuple[Optional[Set[str]], int]:
+    c = pattern[pos]
+    if c != "\\":
+        return {c}, pos + 1
+    if pattern[pos + 1] == "b":
+        # backspace in a character class
+        return {"\b"}, pos + 2
+    chars, _, pos = _guess_escape(pattern, pos + 1)
+    return chars, pos
+
+
+def _guess_group(pattern: str, pos: int) -> Tuple[Optional[Set[str]], bool, int]:
+    zero_width = False
+    if pattern.startswith("(?:", pos):
+        pos += 3
+    elif pattern.startswith("(?P<", pos):
+        pos = pattern.index(">", pos) + 1
+    elif pattern.startswith(("(?=", "(?!"), pos):
+        zero_width = True
+        pos += 3
+    elif pattern.startswith(("(?<=", "(?<!"), pos):
+        zero_width = True
+        pos += 4
+    elif pattern.startswith("(?P=", pos):
+        return None, False, pattern.index(")", pos) + 1
+    elif pattern.startswith("(?", pos):
+        # inline flags, e.g. (?i)
+        raise ValueError(pattern)
+    else:
+        pos += 1
+
+    chars, nullable, pos = _guess_alternation(pattern, pos)
+    if pattern[pos] != ")":
+        raise ValueError(pattern)
+    if zero_width:
+        return set(), True, pos + 1
+    return chars, nullable, pos + 1
+
+
+def _parse_quantifier(pattern: str, pos: int) -> Tuple[bool, int]:
+    if pos >= len(pattern):
+        return False, pos
+
+    c = pattern[pos]
+    if c in "*?":
+        optional = True
+        pos += 1
+    elif c == "+":
+        optional = False
+        pos += 1
+    elif c == "{":
+        m = _QUANTIFIER_RE.match(pattern, pos)
+        if not m:
+            raise ValueError(pattern)
+        optional = not m.group(1) or int(m.group(1)) == 0
+        pos = m.end()
+    else:
+        return False, pos
+
+    # lazy or possessive quantifiers
+    if pos < len(pattern) and pattern[pos] in "?+":
+        pos += 1
+    return optional, pos
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Match, MutableMapping, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Match, MutableMapping, Optional, Pattern, Set
 
 from ._inline.emphasis import finalize_emphasis_tokens, is_entity_boundary
 from ._inline.links import parse_link as parse_inline_link
 from .core import InlineState, Parser
-from .helpers import HTML_ATTRIBUTES, HTML_TAGNAME, PUNCTUATION, unescape_char
+from .helpers import HTML_ATTRIBUTES, HTML_TAGNAME, PUNCTUATION, char_class_pattern, guess_start_chars, unescape_char
 from .util import escape_url
 
-_REGEX_META_CHARS = set(r"()[]{}?*+|.^$")
 DEFAULT_MAX_EMPHASIS_DEPTH = 20
 DEFAULT_MAX_IMAGE_DEPTH = 20
 
@@ -82,7 +81,9 @@ class InlineParser(Parser[InlineState]):
         self.max_image_depth = max_image_depth
         self._fast_trigger_chars: Optional[Set[str]] = None
         self._fast_trigger_re: Optional[re.Pattern[str]] = None
-        self._fast_trigger_re_chars: Optional[Tuple[str, ...]] = None
+        self._fast_trigger_re_chars: Optional[Set[str]] = None
+        # released states, they are reused by ``__call__``
+        self._state_pool: List[InlineState] = []
         # lazy add linebreak
         if hard_wrap:
             self.specification["linebreak"] = self.HARD_LINEBREAK
@@ -91,18 +92,37 @@ class InlineParser(Parser[InlineState]):
 
         self._methods = {name: getattr(self, "parse_" + name) for name in self.rules}
 
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super(InlineParser, self).__getstate__()
+        state["_fast_trigger_re"] = None
+        state["_fast_trigger_re_chars"] = None
+        state["_state_pool"] = []
+        return state
+
     def register(
         self,
         name: str,
         pattern: Optional[str],
         func: Any,
         before: Optional[str] = None,
+        start_chars: Optional[Iterable[str]] = None,
     ) -> None:
-        super().register(name, pattern, func, before=before)
+        super().register(name, pattern, func, before=before, start_chars=start_chars)
         self._fast_trigger_chars = None
         self._fast_trigger_re = None
         self._fast_trigger_re_chars = None
 
+    def precompile(self) -> None:
+        """Compile the scanner of all rules, the precedence scanners and the
+        fast text scanner ahead of time."""
+        super(InlineParser, self).precompile()
+        self._precompile_rules(["codespan", "link", "prec_auto_link", "prec_inline_html"])
+        for name in ("codespan", "link", "auto_link", "inline_html"):
+            self._precompile_rules([name])
+        chars = self._get_fast_trigger_chars()
+        if chars is not None:
+            self._get_fast_trigger_re(chars)
+
     def parse_escape(self, m: Match[str], state: InlineState) -> int:
         text = m.group(0)
         text = unescape_char(text)
@@ -211,11 +231,20 @@ class InlineParser(Parser[InlineState]):
                 token["_emphasis"] = False
             state.append_token(token)
 
+    def get_start_chars(self, name: str) -> Optional[Set[str]]:
+        chars = super(InlineParser, self).get_start_chars(name)
+        if chars is None:
+            return _get_rule_start_chars(name, self.specification.get(name))
+        return chars
+
     def parse(self, state: InlineState) -> List[Dict[str, Any]]:
         pos = 0
-        sc = self.compile_sc()
+        dispatcher = self.get_dispatcher()
+        sc = dispatcher.sc
+        chars = self._get_fast_trigger_chars()
+        trigger_re = None if chars is None else self._get_fast_trigger_re(chars)
         while pos < len(state.src):
-            fast_end = self._find_fast_text_end(state.src, pos)
+            fast_end = None if trigger_re is None else self._find_fast_text_end(state.src, pos, trigger_re)
             if fast_end is None:
                 m = sc.search(state.src, pos)
             else:
@@ -224,7 +253,8 @@ class InlineParser(Parser[InlineState]):
                     pos = fast_end
                 if pos >= len(state.src):
                     break
-                m = sc.match(state.src, pos)
+                # only the rules starting with this character are tried
+                m = dispatcher.match(state.src, pos)
 
             if not m:
                 if fast_end is not None:
@@ -259,12 +289,7 @@ class InlineParser(Parser[InlineState]):
         )
         return state.tokens
 
-    def _find_fast_text_end(self, src: str, pos: int) -> Optional[int]:
-        chars = self._get_fast_trigger_chars()
-        if chars is None:
-            return None
-
-        trigger_re = self._get_fast_trigger_re(chars)
+    def _find_fast_text_end(self, src: str, pos: int, trigger_re: Pattern[str]) -> int:
         m = trigger_re.search(src, pos)
         if m is None:
             return len(src)
@@ -274,11 +299,12 @@ class InlineParser(Parser[InlineState]):
         return m.start()
 
     def _get_fast_trigger_re(self, chars: Set[str]) -> re.Pattern[str]:
-        key = tuple(sorted(chars))
-        if self._fast_trigger_re is None or self._fast_trigger_re_chars != key:
-            pattern = "[" + re.escape("".join(key)) + "]"
+        # the set of trigger chars is cached, it is only created again
+        # when a new rule is registered
+        if self._fast_trigger_re is None or self._fast_trigger_re_chars is not chars:
+            pattern = "[" + char_class_pattern(chars) + "]"
             self._fast_trigger_re = re.compile(pattern)
-            self._fast_trigger_re_chars = key
+            self._fast_trigger_re_chars = chars
         assert self._fast_trigger_re is not None
         return self._fast_trigger_re
 
@@ -297,8 +323,9 @@ class InlineParser(Parser[InlineState]):
 
         chars = set()
         for name in self.rules:
-            pattern = self.specification.get(name)
-            rule_chars = _get_rule_start_chars(name, pattern)
+            rule_chars = self.rule_start_chars.get(name)
+            if rule_chars is None:
+                rule_chars = _get_rule_start_chars(name, self.specification.get(name))
             if rule_chars is None:
                 self._fast_trigger_chars = None
                 return None
@@ -348,10 +375,40 @@ class InlineParser(Parser[InlineState]):
         self.parse(state)
         return state.tokens
 
+    def parse_many(self, sources: Iterable[str], env: MutableMapping[str, Any]) -> List[List[Dict[str, Any]]]:
+        """Parse many inline sources with the same ``env``, e.g. the text of
+        all the leaf blocks of a document. The result is the same as calling
+        the parser on every source, but the state is only set up once::
+
+            heading, paragraph = md.inline.parse_many(['a *b*', 'c'], state.env)
+        """
+        try:
+            state = self._state_pool.pop()
+        except IndexError:
+            state = self.state_cls(env)
+
+        results = []
+        for s in sources:
+            state.reset(env, s)
+            results.append(self.render(state))
+
+        state.reset({})
+        self._state_pool.append(state)
+        return results
+
     def __call__(self, s: str, env: MutableMapping[str, Any]) -> List[Dict[str, Any]]:
-        state = self.state_cls(env)
-        state.src = s
-        return self.render(state)
+        try:
+            state = self._state_pool.pop()
+            state.reset(env, s)
+        except IndexError:
+            state = self.state_cls(env)
+            state.src = s
+
+        tokens = self.render(state)
+        # the returned tokens are not shared with the released state
+        state.reset({})
+        self._state_pool.append(state)
+        return tokens
 
 
 def _get_rule_start_chars(name: str, pattern: Optional[str]) -> Optional[Set[str]]:
@@ -367,36 +424,9 @@ def _get_rule_start_chars(name: str, pattern: Optional[str]) -> Optional[Set[str
         "softbreak": {"\n"},
         "prec_auto_link": {"<"},
         "prec_inline_html": {"<"},
-        # built-in plugins
-        "url_link": {"h"},
-        "strikethrough": {"~"},
-        "mark": {"="},
-        "insert": {"^"},
-        "superscript": {"^"},
-        "subscript": {"~"},
-        "footnote": {"["},
-        "inline_math": {"$"},
-        "ruby": {"["},
-        "inline_spoiler": {">"},
     }
     if name in known:
         return known[name]
     if not pattern:
         return set()
-    return _guess_pattern_start_chars(pattern)
-
-
-def _guess_pattern_start_chars(pattern: str) -> Optional[Set[str]]:
-    if not pattern:
-        return set()
-
-    if pattern.startswith("\\") and len(pattern) > 1:
-        c = pattern[1]
-        if c in _REGEX_META_CHARS or c in PUNCTUATION:
-            return {c}
-        return None
-
-    c = pattern[0]
-    if c in _REGEX_META_CHARS or c.isspace():
-        return None
-    return {c}
+    return guess_start_chars(pattern)
@@ -42,7 +42,7 @@ class _ListMarker:
 
 @dataclass
 class _ListItemLines:
-    src: str
+    lines: list[str]
     next_item: Optional[_ListMarker] = None
     loose: bool = False
     end_pos: Optional[int] = None
@@ -140,7 +140,7 @@ def _parse_list_item(
         token["_tok_index"] = lines.token_index
         token["_end_pos"] = lines.end_pos
 
-    child = state.child_state(_build_list_item_source(text, lines.src, continue_width))
+    child = state.child_state(_build_list_item_source(text, lines.lines, continue_width))
 
     block.parse(child, rules)
 
@@ -167,26 +167,30 @@ def _collect_list_item_lines(
     text: str,
     continue_width: int,
 ) -> _ListItemLines:
-    src = ""
+    # collect the lines and join them once, instead of copying the
+    # growing source for every line
+    lines: list[str] = []
+    has_text = False
     next_item = None
     prev_blank_line = False
     while state.cursor < state.cursor_max:
         raw_line = state.get_line(state.cursor)
         next_pos = state.cursor + len(raw_line)
         if block.BLANK_LINE.match(raw_line):
-            src += "\n"
+            lines.append("\n")
             prev_blank_line = True
             state.cursor = next_pos
             continue
 
         has_continuation = _has_continuation_indent(raw_line, continue_width)
         if has_continuation:
-            if prev_blank_line and not text and not src.strip():
+            if prev_blank_line and not text and not has_text:
                 # Example 280
                 # A list item can begin with at most one blank line
                 break
 
-            src += raw_line
+            lines.append(raw_line)
+            has_text = True
             prev_blank_line = False
             state.cursor = next_pos
             continue
@@ -198,7 +202,7 @@ def _collect_list_item_lines(
             if tok_type == "list_item":
                 next_item = _create_list_marker(m, "listitem")
                 state.cursor = next_pos
-                return _ListItemLines(src, next_item=next_item, loose=prev_blank_line)
+                return _ListItemLines(lines, next_item=next_item, loose=prev_blank_line)
 
             if tok_type == "list":
                 break
@@ -206,16 +210,17 @@ def _collect_list_item_lines(
             tok_index = len(state.tokens)
             end_pos = block.parse_method(m, state)
             if end_pos:
-                return _ListItemLines(src, end_pos=end_pos, token_index=tok_index)
+                return _ListItemLines(lines, end_pos=end_pos, token_index=tok_index)
 
         if prev_blank_line and not has_continuation:
             # not a continue line, and previous line is blank
             break
 
-        src += raw_line
+        lines.append(raw_line)
+        has_text = True
         state.cursor = next_pos
 
-    return _ListItemLines(src)
+    return _ListItemLines(lines)
 
 
 def _create_list_marker(m: Match[str], prefix: str) -> _ListMarker:
@@ -226,9 +231,8 @@ def _create_list_marker(m: Match[str], prefix: str) -> _ListMarker:
     )
 
 
-def _build_list_item_source(text: str, src: str, continue_width: int) -> str:
-    text += _clean_list_item_text(src, continue_width)
-    return strip_end(text)
+def _build_list_item_source(text: str, lines: list[str], continue_width: int) -> str:
+    return strip_end(text + _clean_list_item_text(lines, continue_width))
 
 
 def _compile_list_break_sc(block: "BlockParser", leading_width: int) -> Pattern[str]:
@@ -324,16 +328,14 @@ def _compile_continue_width(text: str, leading_width: int) -> tuple[str, int]:
     return text, continue_width
 
 
-def _clean_list_item_text(src: str, continue_width: int) -> str:
+def _clean_list_item_text(lines: list[str], continue_width: int) -> str:
     rv = []
-    lines = src.split("\n")
     for line in lines:
         if _has_continuation_indent(line, continue_width):
             rv.append(_strip_continuation_indent(line, continue_width))
         else:
             rv.append(_expand_leading_tabs(line))
-
-    return "\n".join(rv)
+    return "".join(rv)
 
 
 def _has_continuation_indent(line: str, columns: int) -> bool:
@@ -348,6 +350,9 @@ def _strip_continuation_indent(line: str, columns: int) -> str:
 
 
 def _expand_leading_tabs(line: str, start_column: int = 0) -> str:
+    if not line.lstrip(" ").startswith("\t"):
+        return line
+
     column = start_column
     parts = []
     index = 0
@@ -367,6 +372,10 @@ def _expand_leading_tabs(line: str, start_column: int = 0) -> str:
 
 
 def _count_indent(text: str) -> int:
+    stripped = text.lstrip(" ")
+    if not stripped.startswith("\t"):
+        return len(text) - len(stripped)
+
     column = 0
     for c in text:
         if c == " ":
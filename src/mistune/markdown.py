@@ -1,9 +1,10 @@
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
 
 from .block_parser import BlockParser
 from .core import BaseRenderer, BlockState
 from .inline_parser import InlineParser
 from .plugins import Plugin
+from .tokens import LazyToken
 
 
 class Markdown:
@@ -50,23 +51,54 @@ class Markdown:
     def use(self, plugin: Plugin) -> None:
         plugin(self)
 
+    def precompile(self) -> "Markdown":
+        """Compile the scanners of the block and inline parsers ahead of time.
+        A precompiled instance can be pickled and sent to worker processes,
+        which saves the cost of registering plugins again::
+
+            md = mistune.create_markdown(plugins=[...]).precompile()
+            data = pickle.dumps(md)
+        """
+        self.block.precompile()
+        self.inline.precompile()
+        return self
+
     def render_state(self, state: BlockState) -> Union[str, List[Dict[str, Any]]]:
-        data = self._iter_render(state.tokens, state)
+        self._parse_inline_tokens(state.tokens, state)
+        data = state.tokens
         if self.renderer:
             return self.renderer(data, state)
         return list(data)
 
-    def _iter_render(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> Iterable[Dict[str, Any]]:
+    def _parse_inline_tokens(self, tokens: List[Dict[str, Any]], state: BlockState) -> None:
+        # parse the text of all leaf blocks in one batch, in document order
+        leaves: List[Dict[str, Any]] = []
+        _collect_leaf_tokens(tokens, leaves)
+        self._parse_leaf_tokens(leaves, state)
+
+    def _parse_leaf_tokens(self, leaves: List[Dict[str, Any]], state: BlockState) -> List[str]:
+        texts = [tok.pop("text") for tok in leaves]
+        # avoid striping emsp or other unicode spaces
+        sources = [text.strip(" \r\n\t\f") for text in texts]
+        for tok, children in zip(leaves, self.inline.parse_many(sources, state.env)):
+            tok["children"] = children
+        return texts
+
+    def _iter_parsed_blocks(self, tokens: List[Dict[str, Any]], state: BlockState) -> Iterator[Dict[str, Any]]:
+        # parse the inline text of one top level block right before it is
+        # rendered, the inline tokens are released once it has been rendered
         for tok in tokens:
-            if "children" in tok:
-                children = self._iter_render(tok["children"], state)
-                tok["children"] = list(children)
-            elif "text" in tok:
-                text = tok.pop("text")
-                # process inline text
-                # avoid striping emsp or other unicode spaces
-                tok["children"] = self.inline(text.strip(" \r\n\t\f"), state.env)
+            leaves: List[Dict[str, Any]] = []
+            _collect_leaf_tokens((tok,), leaves)
+            if not leaves:
+                yield tok
+                continue
+
+            texts = self._parse_leaf_tokens(leaves, state)
             yield tok
+            for leaf, text in zip(leaves, texts):
+                del leaf["children"]
+                leaf["text"] = text
 
     def parse(self, s: str, state: Optional[BlockState] = None) -> Tuple[Union[str, List[Dict[str, Any]]], BlockState]:
         """Parse and convert the given markdown string. If renderer is None,
@@ -76,6 +108,192 @@ class Markdown:
         :param state: instance of BlockState
         :returns: result, state
         """
+        state = self._parse_state(s, state)
+        result = self.render_state(state)
+
+        for hook3 in self.after_render_hooks:
+            result = hook3(self, result, state)
+        return result, state
+
+    def parse_blocks(self, s: str, state: Optional[BlockState] = None) -> Tuple[List[Dict[str, Any]], BlockState]:
+        """Parse the block structure of the given markdown string only. The
+        inline parser is skipped, tokens keep their raw inline source in
+        ``text``. It is the fastest way to get headings, code blocks, lists
+        and tables of a document::
+
+            tokens, state = md.parse_blocks(text)
+            # => [{'type': 'heading', 'text': 'hello *world*', ...}, ...]
+
+        The ``before_render_hooks`` are called, the renderer and the
+        ``after_render_hooks`` are not.
+
+        :param s: markdown string
+        :param state: instance of BlockState
+        :returns: tokens, state
+        """
+        state = self._parse_state(s, state)
+        return state.tokens, state
+
+    def parse_lazy(self, s: str, state: Optional[BlockState] = None) -> Tuple[List[LazyToken], BlockState]:
+        """Parse the block structure of the given markdown string, the inline
+        children of the tokens are parsed when they are accessed at the first
+        time. This is helpful for consumers which only need a part of the
+        document::
+
+            tokens, state = md.parse_lazy(text)
+            for tok in tokens:
+                if tok['type'] == 'heading':
+                    print(tok['children'])
+
+        The tokens are :class:`LazyToken` objects, call ``token.to_dict()``
+        to convert a token into a ``dict``. The ``after_render_hooks`` are not
+        run, e.g. the ``footnotes`` token of the footnotes plugin is missing.
+
+        :param s: markdown string
+        :param state: instance of BlockState
+        :returns: tokens, state
+        """
+        state = self._parse_state(s, state)
+        tokens = self._lazy_tokens(state.tokens, state)
+        state.tokens = cast(List[Dict[str, Any]], tokens)
+        return tokens, state
+
+    def _lazy_tokens(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> List[LazyToken]:
+        rv: List[LazyToken] = []
+        for tok in tokens:
+            tok = dict(tok.items())
+            if "children" in tok:
+                tok["children"] = self._lazy_tokens(tok["children"], state)
+                rv.append(LazyToken(**tok))
+            elif "text" in tok:
+                text = tok.pop("text")
+                rv.append(LazyToken(inline_src=text, inline=self.inline, env=state.env, **tok))
+            else:
+                rv.append(LazyToken(**tok))
+        return rv
+
+    def reparse(
+        self, state: BlockState, start: int, end: int, text: str
+    ) -> Tuple[Union[str, List[Dict[str, Any]]], BlockState]:
+        """Replace ``state.src[start:end]`` with ``text`` and parse the new
+        document again. Only the top level blocks around the edit are parsed,
+        the other tokens of the previous ``state`` are reused, this is
+        helpful for live preview editors::
+
+            md = mistune.create_markdown()
+            html, state = md.parse(text)
+            # user types "foo" at position 120
+            html, state = md.reparse(state, 120, 120, 'foo')
+
+        The whole document is parsed again when the edit adds or removes
+        definitions (e.g. reference links), or when there are any parse or
+        render hooks. The previous ``state`` should not be used anymore.
+
+        :param state: the state returned by ``parse`` or ``reparse``
+        :param start: start position of the replaced text in ``state.src``
+        :param end: end position of the replaced text in ``state.src``
+        :param text: the new markdown text
+        :returns: result, state
+        """
+        if not 0 <= start <= end <= len(state.src):
+            raise ValueError("Invalid edit range: {}-{}".format(start, end))
+
+        text = text.replace("\r\n", "\n")
+        text = text.replace("\r", "\n")
+
+        new_state = None
+        if not self.before_parse_hooks and not self.before_render_hooks and not self.after_render_hooks:
+            new_state = self.block.reparse(state, start, end, text)
+
+        if new_state is None:
+            fresh_state = self.block.state_cls()
+            if "__file__" in state.env:
+                fresh_state.env["__file__"] = state.env["__file__"]
+            return self.parse(state.src[:start] + text + state.src[end:], fresh_state)
+
+        return self.render_state(new_state), new_state
+
+    def render_iter(self, s: str, state: Optional[BlockState] = None) -> Iterator[str]:
+        """Render the given markdown string into chunks of output. The chunks
+        are yielded top-level block by top-level block, so that the caller
+        can send the output before the whole document has been rendered::
+
+            md = mistune.create_markdown()
+            for chunk in md.render_iter(text):
+                response.write(chunk)
+
+        The ``after_render_hooks`` are called with an empty string once all
+        the blocks have been yielded, and their output is yielded at last.
+        Renderers which post-process the whole output (e.g. the Markdown
+        and RST renderers) yield the output in one chunk.
+
+        The inline text of a block is parsed right before the block is
+        rendered, and the inline tokens are released after it. The tokens
+        in ``state.tokens`` keep their inline source in ``text``, the same
+        as the result of ``parse_blocks``.
+
+        :param s: markdown string
+        :param state: instance of BlockState
+        """
+        renderer = self.renderer
+        if renderer is None:
+            raise ValueError("render_iter requires a renderer")
+
+        state = self._parse_state(s, state)
+        data = self._iter_parsed_blocks(state.tokens, state)
+        if type(renderer).__call__ is not BaseRenderer.__call__:
+            result: Union[str, List[Dict[str, Any]]] = renderer(data, state)
+        else:
+            for chunk in renderer.iter_tokens(data, state):
+                if chunk:
+                    yield chunk
+            result = ""
+
+        for hook in self.after_render_hooks:
+            result = hook(self, result, state)
+        if result:
+            yield cast(str, result)
+
+    def render_to(self, fp: IO[str], s: str, state: Optional[BlockState] = None) -> BlockState:
+        """Render the given markdown string and write the output into a
+        file-like object, e.g. an opened file or ``io.StringIO``. The output
+        is written piece by piece, it is never joined into one string::
+
+            md = mistune.create_markdown()
+            with open('index.html', 'w') as f:
+                md.render_to(f, text)
+
+        The ``after_render_hooks`` are called with an empty string once the
+        whole document has been written, and their output is written at
+        last. The inline tokens are released block by block, the same as
+        ``render_iter``.
+
+        :param fp: a file-like object with a ``write`` method
+        :param s: markdown string
+        :param state: instance of BlockState
+        :returns: state
+        """
+        renderer = self.renderer
+        if renderer is None:
+            raise ValueError("render_to requires a renderer")
+
+        state = self._parse_state(s, state)
+        data = self._iter_parsed_blocks(state.tokens, state)
+        cls = type(renderer)
+        if cls.render_into is BaseRenderer.render_into and cls.__call__ is not BaseRenderer.__call__:
+            # the renderer post-processes the whole output
+            fp.write(renderer(data, state))
+        else:
+            renderer.render_into(data, state, fp.write)
+
+        result: Union[str, List[Dict[str, Any]]] = ""
+        for hook in self.after_render_hooks:
+            result = hook(self, result, state)
+        if result:
+            fp.write(cast(str, result))
+        return state
+
+    def _parse_state(self, s: str, state: Optional[BlockState] = None) -> BlockState:
         if state is None:
             state = self.block.state_cls()
 
@@ -91,15 +309,9 @@ class Markdown:
             hook(self, state)
 
         self.block.parse(state)
-
         for hook2 in self.before_render_hooks:
             hook2(self, state)
-
-        result = self.render_state(state)
-
-        for hook3 in self.after_render_hooks:
-            result = hook3(self, result, state)
-        return result, state
+        return state
 
     def read(
         self, filepath: str, encoding: str = "utf-8", state: Optional[BlockState] = None
@@ -118,3 +330,11 @@ class Markdown:
         if s is None:
             s = "\n"
         return self.parse(s)[0]
+
+
+def _collect_leaf_tokens(tokens: Iterable[Dict[str, Any]], leaves: List[Dict[str, Any]]) -> None:
+    for tok in tokens:
+        if "children" in tok:
+            _collect_leaf_tokens(tok["children"], leaves)
+        elif "text" in tok:
+            leaves.append(tok)
@@ -1,6 +1,6 @@
 import re
-import types
-from typing import TYPE_CHECKING, List, Match, Tuple
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Match, Pattern, Tuple
 
 from ..helpers import PREVENT_BACKSLASH
 from ..util import escape
@@ -11,7 +11,7 @@ if TYPE_CHECKING:
     from ..inline_parser import InlineParser
     from ..markdown import Markdown
 
-__all__ = ["abbr"]
+__all__ = ["abbr", "compile_abbrs"]
 TextSegment = Tuple[str, bool]
 
 # https://michelf.ca/projects/php-markdown/extra/#abbr
@@ -21,6 +21,56 @@ REF_ABBR = (
 )
 
 
+def compile_abbrs(keys: FrozenSet[str]) -> Pattern[str]:
+    """Compile the abbreviation keys into one regex. The keys are merged
+    into a trie, so the regex checks every character only once, no matter
+    how many keys there are. When two keys overlap, the longest one is
+    matched, e.g. ``HTML5`` wins over ``HTML``::
+
+        compile_abbrs(frozenset(['HTML', 'HTML5'])).pattern  # => 'HTML(?:5)?'
+
+    The compiled regex is cached, documents sharing the same glossary
+    reuse it.
+    """
+    return _compile_abbrs(keys)
+
+
+@lru_cache(maxsize=32)
+def _compile_abbrs(keys: FrozenSet[str]) -> Pattern[str]:
+    trie: Dict[str, Any] = {}
+    for key in keys:
+        node = trie
+        for c in key:
+            node = node.setdefault(c, {})
+        node[""] = True
+
+    try:
+        return re.compile(_trie_to_regex(trie))
+    except RecursionError:
+        # too deeply nested trie, longer keys are tried at first
+        return re.compile("|".join(re.escape(k) for k in sorted(keys, key=len, reverse=True)))
+
+
+def _trie_to_regex(node: Dict[str, Any]) -> str:
+    # a chain of single characters is merged into one literal
+    prefix = ""
+    while len(node) == 1 and "" not in node:
+        c, node = next(iter(node.items()))
+        prefix += re.escape(c)
+
+    branches = [re.escape(c) + _trie_to_regex(child) for c, child in sorted(node.items()) if c]
+    if not branches:
+        return prefix
+    if len(branches) == 1 and len(node) == 1:
+        return prefix + branches[0]
+
+    pattern = "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # the key ends here, but a longer key is tried at first
+        pattern += "?"
+    return prefix + pattern
+
+
 def parse_ref_abbr(block: "BlockParser", m: Match[str], state: "BlockState") -> int:
     ref = state.env.get("ref_abbrs")
     if not ref:
@@ -81,7 +131,7 @@ def process_text(
 
     abbrs_re = state.env.get("abbrs_re")
     if not abbrs_re:
-        abbrs_re = re.compile(r"|".join(re.escape(k) for k in ref.keys()))
+        abbrs_re = compile_abbrs(frozenset(ref))
         state.env["abbrs_re"] = abbrs_re
 
     pos = 0
@@ -136,8 +186,8 @@ def abbr(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.block.register("ref_abbr", REF_ABBR, parse_ref_abbr, before="paragraph")
+    md.block.register("ref_abbr", REF_ABBR, parse_ref_abbr, before="paragraph", start_chars=" *")
     # replace process_text
-    md.inline.process_text = types.MethodType(process_text, md.inline)  # type: ignore[method-assign]
+    md.inline.process_text = partial(process_text, md.inline)  # type: ignore[method-assign]
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("abbr", render_abbr)
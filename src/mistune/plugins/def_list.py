@@ -193,7 +193,7 @@ def def_list(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.block.register("def_list", DEF_PATTERN, parse_def_list, before="paragraph")
+    md.block.register("def_list", DEF_PATTERN, parse_def_list, before="paragraph", start_chars=":")
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("def_list", render_def_list)
         md.renderer.register("def_list_head", render_def_list_head)
@@ -2,6 +2,7 @@ import re
 from typing import TYPE_CHECKING, Any, Dict, List, Match, Union
 
 from ..core import BlockState
+from ..helpers import find_ref_key
 from ..util import unikey
 
 if TYPE_CHECKING:
@@ -28,9 +29,8 @@ INLINE_FOOTNOTE = r"\[\^(?P<footnote_key>" + _FOOTNOTE_LABEL + r")\]"
 
 
 def parse_inline_footnote(inline: "InlineParser", m: Match[str], state: "InlineState") -> int:
-    key = unikey(m.group("footnote_key"))
-    ref = state.env.get("ref_footnotes")
-    if ref and key in ref:
+    key = find_ref_key(state.env, "ref_footnotes", m.group("footnote_key"))
+    if key is not None:
         notes = state.env.get("footnotes")
         if not notes:
             notes = []
@@ -152,12 +152,14 @@ def footnotes(md: "Markdown") -> None:
         INLINE_FOOTNOTE,
         parse_inline_footnote,
         before="link",
+        start_chars="[",
     )
     md.block.register(
         "ref_footnote",
         REF_FOOTNOTE,
         parse_ref_footnote,
         before="ref_link",
+        start_chars=" [",
     )
     md.after_render_hooks.append(md_footnotes_hook)
 
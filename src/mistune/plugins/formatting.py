@@ -139,6 +139,7 @@ def strikethrough(md: "Markdown") -> None:
         r"~~(?=[^\s~])",
         parse_strikethrough,
         before="link",
+        start_chars="~",
     )
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("strikethrough", render_strikethrough)
@@ -159,6 +160,7 @@ def mark(md: "Markdown") -> None:
         r"==(?=[^\s=])",
         parse_mark,
         before="link",
+        start_chars="=",
     )
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("mark", render_mark)
@@ -179,6 +181,7 @@ def insert(md: "Markdown") -> None:
         r"\^\^(?=[^\s\^])",
         parse_insert,
         before="link",
+        start_chars="^",
     )
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("insert", render_insert)
@@ -194,7 +197,7 @@ def superscript(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.inline.register("superscript", SUPERSCRIPT_PATTERN, parse_superscript, before="linebreak")
+    md.inline.register("superscript", SUPERSCRIPT_PATTERN, parse_superscript, before="linebreak", start_chars="^")
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("superscript", render_superscript)
 
@@ -209,6 +212,6 @@ def subscript(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.inline.register("subscript", SUBSCRIPT_PATTERN, parse_subscript, before="linebreak")
+    md.inline.register("subscript", SUBSCRIPT_PATTERN, parse_subscript, before="linebreak", start_chars="~")
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("subscript", render_subscript)
@@ -68,8 +68,8 @@ def math(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.block.register("block_math", BLOCK_MATH_PATTERN, parse_block_math, before="list")
-    md.inline.register("inline_math", INLINE_MATH_PATTERN, parse_inline_math, before="codespan")
+    md.block.register("block_math", BLOCK_MATH_PATTERN, parse_block_math, before="list", start_chars=" $")
+    md.inline.register("inline_math", INLINE_MATH_PATTERN, parse_inline_math, before="codespan", start_chars="$")
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("block_math", render_block_math)
         md.renderer.register("inline_math", render_inline_math)
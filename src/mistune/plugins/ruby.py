@@ -1,8 +1,7 @@
 import re
 from typing import TYPE_CHECKING, Any, Dict, List, Match, Optional
 
-from ..helpers import parse_link, parse_link_label
-from ..util import unikey
+from ..helpers import find_ref_key, parse_link, parse_link_label
 
 if TYPE_CHECKING:
     from ..core import BaseRenderer, InlineState
@@ -67,8 +66,8 @@ def _parse_ruby_link(
         label, link_pos = parse_link_label(state.src, pos + 1)
         if label and link_pos:
             ref_links = state.env["ref_links"]
-            key = unikey(label)
-            env = ref_links.get(key)
+            key = find_ref_key(state.env, "ref_links", label)
+            env = ref_links[key] if key is not None else None
             if env:
                 attrs = {"url": env["url"], "title": env.get("title")}
                 state.append_token(
@@ -111,6 +110,6 @@ def ruby(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.inline.register("ruby", RUBY_PATTERN, parse_ruby, before="link")
+    md.inline.register("ruby", RUBY_PATTERN, parse_ruby, before="link", start_chars="[")
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("ruby", render_ruby)
@@ -97,7 +97,7 @@ def spoiler(md: "Markdown") -> None:
     """
     # reset block quote parser with block spoiler parser
     md.block.register("block_quote", None, parse_block_spoiler)
-    md.inline.register("inline_spoiler", INLINE_SPOILER_PATTERN, parse_inline_spoiler)
+    md.inline.register("inline_spoiler", INLINE_SPOILER_PATTERN, parse_inline_spoiler, start_chars=">")
     if md.renderer and md.renderer.NAME == "html":
         md.renderer.register("block_spoiler", render_block_spoiler)
         md.renderer.register("inline_spoiler", render_inline_spoiler)
@@ -223,7 +223,7 @@ def table(md: "Markdown") -> None:
 
     :param md: Markdown instance
     """
-    md.block.register("table", TABLE_PATTERN, parse_table, before="paragraph")
+    md.block.register("table", TABLE_PATTERN, parse_table, before="paragraph", start_chars=" |")
     md.block.register("nptable", NP_TABLE_PATTERN, parse_nptable, before="paragraph")
 
     if md.renderer and md.renderer.NAME == "html":
@@ -29,4 +29,4 @@ def parse_url_link(inline: "InlineParser", m: Match[str], state: "InlineState")
 
 
 def url(md: "Markdown") -> None:
-    md.inline.register("url_link", URL_LINK_PATTERN, parse_url_link)
+    md.inline.register("url_link", URL_LINK_PATTERN, parse_url_link, start_chars="h")
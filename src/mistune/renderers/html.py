@@ -1,10 +1,26 @@
-from typing import Any, ClassVar, Dict, Iterable, Literal, Optional, Tuple, Union
+import re
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Literal, Optional, Set, Tuple, Union
 from urllib.parse import unquote
 
 from ..core import BaseRenderer, BlockState
 from ..util import escape as escape_text
 from ..util import safe_entity, striptags
 
+_WRAPPER_METHODS = (
+    "emphasis",
+    "strong",
+    "link",
+    "paragraph",
+    "heading",
+    "block_text",
+    "block_quote",
+    "list",
+    "list_item",
+)
+_TEXT_MARKER = "\x00\ufdd0text\ufdd0\x00"
+# the max number of memoized results of ``safe_url``
+_SAFE_URL_CACHE_SIZE = 4096
+
 
 class HTMLRenderer(BaseRenderer):
     """A renderer for converting Markdown to HTML."""
@@ -37,41 +53,132 @@ class HTMLRenderer(BaseRenderer):
         super(HTMLRenderer, self).__init__()
         self._allow_harmful_protocols = allow_harmful_protocols
         self._escape = escape
+        self._url_matcher: Optional[re.Pattern[str]] = None
+        self._url_matcher_key: Tuple[Any, ...] = ()
+        self._safe_url_cache: Dict[str, str] = {}
+        self._get_url_matcher()
 
     def render_token(self, token: Dict[str, Any], state: BlockState) -> str:
         # backward compitable with v2
         func = self._get_method(token["type"])
         attrs = token.get("attrs")
 
-        if "raw" in token:
-            text = token["raw"]
-        elif "children" in token:
-            text = self.render_tokens(token["children"], state)
-        else:
-            if attrs:
-                return func(**attrs)
-            else:
+        text = token.get("raw")
+        if text is None:
+            children = token.get("children")
+            if children is None:
+                if attrs:
+                    return func(**attrs)
                 return func()
+            text = self.render_tokens(children, state)
         if attrs:
             return func(text, **attrs)
         else:
             return func(text)
 
+    def render_tokens(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> str:
+        # escaping adjacent text tokens at once saves function calls, it is
+        # only done when the ``text`` method is not customized
+        if isinstance(tokens, list) and type(self).text is HTMLRenderer.text:
+            tokens = _merge_text_tokens(tokens, self._escape)
+        return super(HTMLRenderer, self).render_tokens(tokens, state)
+
+    def render_into(self, tokens: Iterable[Dict[str, Any]], state: BlockState, write: Callable[[str], Any]) -> None:
+        # the built-in methods which wrap the text without changing it are
+        # split into an opening part and a closing part, the children are
+        # written between them instead of being joined into the text
+        cls = type(self)
+        if cls.render_tokens is not HTMLRenderer.render_tokens:
+            # the customized method may change the joined output
+            write(self.render_tokens(tokens, state))
+            return
+        if cls.render_token is not HTMLRenderer.render_token:
+            # the customized method decides how the children are rendered
+            for chunk in self.iter_tokens(tokens, state):
+                write(chunk)
+            return
+
+        wrappers = {name for name in _WRAPPER_METHODS if getattr(cls, name) is getattr(HTMLRenderer, name)}
+        self._render_into(tokens, state, write, wrappers)
+
+    def _render_into(
+        self,
+        tokens: Iterable[Dict[str, Any]],
+        state: BlockState,
+        write: Callable[[str], Any],
+        wrappers: Set[str],
+    ) -> None:
+        if isinstance(tokens, list) and type(self).text is HTMLRenderer.text:
+            tokens = _merge_text_tokens(tokens, self._escape)
+
+        for tok in tokens:
+            if tok["type"] in wrappers and "raw" not in tok:
+                children = tok.get("children")
+                if children is not None:
+                    attrs = tok.get("attrs")
+                    # the method of the class, a hooked ``_get_method`` (e.g.
+                    # of the profiler) must not see the marker
+                    func = getattr(self, tok["type"])
+                    out = func(_TEXT_MARKER, **attrs) if attrs else func(_TEXT_MARKER)
+                    parts = out.split(_TEXT_MARKER)
+                    if len(parts) == 2:
+                        write(parts[0])
+                        self._render_into(children, state, write, wrappers)
+                        write(parts[1])
+                        continue
+            write(self.render_token(tok, state))
+
     def safe_url(self, url: str) -> str:
         """Ensure the given URL is safe. This method is used for rendering
         links, images, and etc.
         """
-        allow_harmful_protocols = self._allow_harmful_protocols
-        if allow_harmful_protocols is True:
+        if self._allow_harmful_protocols is True:
             return escape_text(url)
 
-        _url = _unquote_url(url).lower().lstrip()
-        if allow_harmful_protocols and _url.startswith(tuple(allow_harmful_protocols)):
-            return escape_text(url)
+        matcher = self._get_url_matcher()
+        cache = self._safe_url_cache
+        rv = cache.get(url)
+        if rv is not None:
+            return rv
 
-        if _is_safe_url(_url, self.SAFE_PROTOCOLS, self.GOOD_DATA_PROTOCOLS):
-            return escape_text(url)
-        return "#harmful-link"
+        _url = _unquote_url(url) if "%" in url else url
+        if matcher.match(_url.lower().lstrip()):
+            rv = escape_text(url)
+        else:
+            rv = "#harmful-link"
+        if len(cache) >= _SAFE_URL_CACHE_SIZE:
+            cache.clear()
+        cache[url] = rv
+        return rv
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super(HTMLRenderer, self).__getstate__()
+        state["_url_matcher"] = None
+        state["_url_matcher_key"] = ()
+        state["_safe_url_cache"] = {}
+        return state
+
+    def _get_url_matcher(self) -> re.Pattern[str]:
+        # the matcher and the memoized results are only created again when
+        # the protocols have been changed
+        key = self._url_matcher_key
+        if (
+            self._url_matcher is None
+            or key[0] is not self.SAFE_PROTOCOLS
+            or key[1] is not self.GOOD_DATA_PROTOCOLS
+            or key[2] is not self._allow_harmful_protocols
+        ):
+            key = (self.SAFE_PROTOCOLS, self.GOOD_DATA_PROTOCOLS, self._allow_harmful_protocols)
+            prefixes = list(self.SAFE_PROTOCOLS) + list(self.GOOD_DATA_PROTOCOLS)
+            allow_harmful_protocols = self._allow_harmful_protocols
+            if allow_harmful_protocols and allow_harmful_protocols is not True:
+                prefixes.extend(allow_harmful_protocols)
+            # relative URLs, and URLs without a scheme before the first "/"
+            pattern = "|".join(re.escape(p) for p in prefixes) + r"|[/#?]|[^:/]*(?:/|\Z)"
+            self._url_matcher = re.compile(pattern)
+            self._url_matcher_key = key
+            self._safe_url_cache.clear()
+        return self._url_matcher
 
     def text(self, text: str) -> str:
         if self._escape:
@@ -174,11 +281,29 @@ def _unquote_url(url: str) -> str:
     return url
 
 
-def _is_safe_url(url: str, safe_protocols: Tuple[str, ...], good_data_protocols: Tuple[str, ...]) -> bool:
-    if url.startswith(safe_protocols):
-        return True
-    if url.startswith(good_data_protocols):
-        return True
-    if url.startswith(("/", "#", "?")):
-        return True
-    return ":" not in url.split("/", 1)[0]
+def _merge_text_tokens(tokens: List[Dict[str, Any]], escape: bool) -> List[Dict[str, Any]]:
+    merged: Optional[List[Dict[str, Any]]] = None
+    prev: Optional[Dict[str, Any]] = None
+    for index, tok in enumerate(tokens):
+        if (
+            prev is not None
+            and tok["type"] == "text"
+            and prev["type"] == "text"
+            and "raw" in tok
+            and "raw" in prev
+            # ``safe_entity`` would unescape an entity split by the two tokens
+            and (escape or "&" not in prev["raw"] or ";" not in tok["raw"])
+        ):
+            if merged is None:
+                merged = tokens[:index]
+            prev = {"type": "text", "raw": prev["raw"] + tok["raw"]}
+            merged[-1] = prev
+            continue
+
+        if merged is not None:
+            merged.append(tok)
+        prev = tok
+
+    if merged is None:
+        return tokens
+    return merged
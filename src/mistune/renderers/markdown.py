@@ -1,9 +1,9 @@
 import re
 from textwrap import indent
-from typing import Any, Dict, Iterable, cast
+from typing import Any, Callable, Dict, Iterable, Iterator, cast
 
 from ..core import BaseRenderer, BlockState
-from ..util import strip_end
+from ..util import strip_end, write_strip_end
 from ._list import render_list, render_list_item
 
 fenced_re = re.compile(r"^[`~]+", re.M)
@@ -25,6 +25,13 @@ class MarkdownRenderer(BaseRenderer):
         out += "\n\n".join(self.render_referrences(state)) + "\n"
         return strip_end(out)
 
+    def render_into(self, tokens: Iterable[Dict[str, Any]], state: BlockState, write: Callable[[str], Any]) -> None:
+        write_strip_end(self._iter_output(tokens, state), write)
+
+    def _iter_output(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> Iterator[str]:
+        yield from self.iter_tokens(tokens, state)
+        yield "\n\n".join(self.render_referrences(state)) + "\n"
+
     def render_referrences(self, state: BlockState) -> Iterable[str]:
         ref_links = state.env["ref_links"]
         for key in ref_links:
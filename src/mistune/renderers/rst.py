@@ -1,8 +1,8 @@
 from textwrap import indent
-from typing import Any, Dict, Iterable, List, cast
+from typing import Any, Callable, Dict, Iterable, Iterator, List, cast
 
 from ..core import BaseRenderer, BlockState
-from ..util import strip_end
+from ..util import strip_end, write_strip_end
 from ._list import render_list, render_list_item
 
 
@@ -39,6 +39,15 @@ class RSTRenderer(BaseRenderer):
         out += "\n\n".join(self.render_referrences(state)) + "\n"
         return strip_end(out)
 
+    def render_into(self, tokens: Iterable[Dict[str, Any]], state: BlockState, write: Callable[[str], Any]) -> None:
+        state.env["inline_images"] = []
+        write_strip_end(self._iter_output(tokens, state), write)
+
+    def _iter_output(self, tokens: Iterable[Dict[str, Any]], state: BlockState) -> Iterator[str]:
+        yield from self.iter_tokens(tokens, state)
+        # inline images are collected while rendering the tokens
+        yield "\n\n".join(self.render_referrences(state)) + "\n"
+
     def render_referrences(self, state: BlockState) -> Iterable[str]:
         images = state.env["inline_images"]
         for index, token in enumerate(images):
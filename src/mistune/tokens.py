@@ -0,0 +1,144 @@
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Optional
+
+_MISSING: Any = object()
+_PENDING: Any = object()
+
+
+class LazyToken(MutableMapping[str, Any]):
+    """A token of :meth:`Markdown.parse_lazy` whose inline ``children`` are
+    parsed on the first access. The raw inline source is saved in
+    ``inline_src``::
+
+        tokens, state = md.parse_lazy(text)
+        heading = tokens[0]
+        heading.inline_src  # => 'hello *world*'
+        heading['children']  # parse the inline source now
+
+    The ``children`` are only parsed when they are accessed through the
+    mapping interface, e.g. ``token['children']``, ``token.get('children')``
+    or ``token.to_dict()``. The ``inline_src`` of tokens without inline
+    source is ``None``. The common keys are saved in slots, other keys are
+    saved in a small dict which is only created when needed.
+    """
+
+    __slots__ = ("type", "raw", "text", "children", "attrs", "style", "_extra", "inline_src", "_inline", "_env")
+
+    FIELDS = ("type", "raw", "text", "children", "attrs", "style")
+
+    type: str
+    raw: Any
+    text: Any
+    children: Any
+    attrs: Any
+    style: Any
+    _extra: Optional[Dict[str, Any]]
+    inline_src: Optional[str]
+    _inline: Optional[Callable[[str, MutableMapping[str, Any]], List[Dict[str, Any]]]]
+    _env: Optional[MutableMapping[str, Any]]
+
+    def __init__(
+        self,
+        type: str,
+        inline_src: Optional[str] = None,
+        inline: Optional[Callable[[str, MutableMapping[str, Any]], List[Dict[str, Any]]]] = None,
+        env: Optional[MutableMapping[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self.type = type
+        self.raw = kwargs.pop("raw", _MISSING)
+        self.text = kwargs.pop("text", _MISSING)
+        self.children = kwargs.pop("children", _MISSING)
+        self.attrs = kwargs.pop("attrs", _MISSING)
+        self.style = kwargs.pop("style", _MISSING)
+        self._extra = kwargs or None
+        self.inline_src = inline_src
+        self._inline = inline
+        self._env = env
+        if inline_src is not None:
+            self.children = _PENDING
+
+    @property
+    def parsed(self) -> bool:
+        """Whether the inline children have been parsed."""
+        return self.children is not _PENDING
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the token and all its children into ``dict`` tokens."""
+        return _to_dict(self)
+
+    def copy(self) -> "LazyToken":
+        return LazyToken(**dict(self.items()))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "children" and self.children is _PENDING:
+            assert self.inline_src is not None and self._inline is not None and self._env is not None
+            # avoid striping emsp or other unicode spaces
+            self.children = self._inline(self.inline_src.strip(" \r\n\t\f"), self._env)
+            self._inline = None
+            self._env = None
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                return default
+            return value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.FIELDS:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.FIELDS:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        count = sum(1 for key in self.FIELDS if getattr(self, key) is not _MISSING)
+        if self._extra:
+            count += len(self._extra)
+        return count
+
+    def __repr__(self) -> str:
+        if self.parsed:
+            return "LazyToken({!r})".format(dict(self.items()))
+        data = {key: getattr(self, key) for key in self.FIELDS if key != "children" and key in self}
+        if self._extra:
+            data.update(self._extra)
+        return "LazyToken({!r}, inline_src={!r})".format(data, self.inline_src)
+
+
+def _to_dict(token: MutableMapping[str, Any]) -> Dict[str, Any]:
+    data = dict(token.items())
+    children = data.get("children")
+    if children is not None:
+        data["children"] = [_to_dict(tok) for tok in children]
+    return data
@@ -1,6 +1,6 @@
 import html
 import re
-from typing import Callable, Match, cast
+from typing import Any, Callable, Iterable, Match, cast
 from urllib.parse import quote
 
 _expand_tab_re = re.compile(r"^( {0,3})\t", flags=re.M)
@@ -23,6 +23,9 @@ def expand_tab(text: str, space: str = "    ") -> str:
 def escape(s: str, quote: bool = True) -> str:
     """Escape characters of ``&<>``. If quote=True, ``"`` will be
     converted to ``&quote;``."""
+    # most text has nothing to escape, ``in`` is faster than ``replace``
+    if "&" not in s and "<" not in s and ">" not in s and (not quote or '"' not in s):
+        return s
     s = s.replace("&", "&amp;")
     s = s.replace("<", "&lt;")
     s = s.replace(">", "&gt;")
@@ -95,3 +98,18 @@ def strip_end(src: str) -> str:
     if newline >= 0:
         return src[:newline] + "\n"
     return src
+
+
+def write_strip_end(chunks: Iterable[str], write: Callable[[str], Any]) -> None:
+    """Write the chunks the same as ``write(strip_end("".join(chunks)))``,
+    without joining them into one string."""
+    # trailing whitespace is held back until a non-whitespace chunk comes
+    pending = ""
+    for chunk in chunks:
+        text = chunk.rstrip()
+        if not text:
+            pending += chunk
+            continue
+        write(pending + text)
+        pending = chunk[len(text) :]
+    write(strip_end(pending))
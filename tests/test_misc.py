@@ -1,4 +1,5 @@
-from unittest import TestCase
+import sys
+from unittest import TestCase, mock
 
 import mistune
 
@@ -220,6 +221,19 @@ class TestMiscCases(TestCase):
         result = mistune.markdown("**b**")
         self.assertEqual(result, expected)
 
+    def test_markdown_func_cache(self):
+        expected = "<p><del>b</del></p>\n"
+        for plugins in (["strikethrough"], ("strikethrough",), ["mistune.plugins.formatting.strikethrough"]):
+            self.assertEqual(mistune.markdown("~~b~~", plugins=plugins), expected)
+
+        mistune.set_markdown_cache_size(2)
+        try:
+            for escape in (True, False, True):
+                mistune.markdown("b", escape=escape, plugins=["table"])
+            self.assertEqual(len(mistune.__dict__["__cached_parsers"]), 2)
+        finally:
+            mistune.set_markdown_cache_size(32)
+
     def test_ast_output(self):
         md = mistune.create_markdown(escape=False, renderer=None)
         text = '# h1\n\nfoo **bar**\n\n`&<>"`'
@@ -361,3 +375,393 @@ class TestMiscCases(TestCase):
 
         pyproject = Path("pyproject.toml").read_text(encoding="utf-8")
         self.assertIn('mistune = "mistune.__main__:cli"', pyproject)
+
+    def test_render_iter(self):
+        text = "# h1\n\nfoo[^1]\n\n- a\n- b\n\n[^1]: note\n"
+        md = mistune.create_markdown(escape=False, plugins=["footnotes"])
+        chunks = list(md.render_iter(text))
+        self.assertEqual("".join(chunks), md(text))
+        self.assertEqual(chunks[0], "<h1>h1</h1>\n")
+        self.assertTrue(chunks[-1].startswith('<section class="footnotes">'))
+
+        from mistune.renderers.markdown import MarkdownRenderer
+
+        md = mistune.create_markdown(renderer=MarkdownRenderer())
+        self.assertEqual(list(md.render_iter(text)), [md(text)])
+
+        md = mistune.create_markdown(renderer=None)
+        self.assertRaises(ValueError, lambda: list(md.render_iter(text)))
+
+    def test_render_to(self):
+        import io
+
+        from mistune.renderers.markdown import MarkdownRenderer
+        from mistune.renderers.rst import RSTRenderer
+
+        text = "# h1\n\n> > foo[^1] *a **b** [c](/d)*\n\n- a\n\n  - b\n\n[^1]: note\n"
+        for renderer, plugins in (("html", ["footnotes"]), (MarkdownRenderer(), []), (RSTRenderer(), [])):
+            md = mistune.create_markdown(renderer=renderer, plugins=plugins)
+            buf = io.StringIO()
+            md.render_to(buf, text)
+            self.assertEqual(buf.getvalue(), md(text))
+
+        # the nested output is written without joining it
+        chunks: list = []
+        fp = mock.Mock(write=chunks.append)
+        mistune.create_markdown().render_to(fp, "> > *a* b\n")
+        self.assertEqual(chunks[:4], ["<blockquote>\n", "<blockquote>\n", "<p>", "<em>"])
+
+        # the inline tokens are released once the block has been rendered
+        state = mistune.create_markdown().render_to(io.StringIO(), "> a *b*\n")
+        paragraph = state.tokens[0]["children"][0]
+        self.assertEqual(paragraph["text"], "a *b*\n")
+        self.assertNotIn("children", paragraph)
+
+        class UpperRenderer(mistune.HTMLRenderer):
+            def render_token(self, token, state):
+                out = super().render_token(token, state)
+                if token["type"] == "emphasis":
+                    return out.upper()
+                return out
+
+        md = mistune.create_markdown(renderer=UpperRenderer())
+        buf = io.StringIO()
+        md.render_to(buf, text)
+        self.assertIn("<EM>A <STRONG>B</STRONG>", buf.getvalue())
+        self.assertEqual(buf.getvalue(), md(text))
+
+        class WrapRenderer(mistune.HTMLRenderer):
+            def render_tokens(self, tokens, state):
+                return "[" + super().render_tokens(tokens, state) + "]"
+
+        md = mistune.create_markdown(renderer=WrapRenderer())
+        buf = io.StringIO()
+        md.render_to(buf, text)
+        self.assertEqual(buf.getvalue(), md(text))
+
+        md = mistune.create_markdown(renderer=None)
+        self.assertRaises(ValueError, md.render_to, io.StringIO(), text)
+
+    def test_render_many(self):
+        from mistune.batch import render_many
+
+        texts = ["# a", "- b", 1, "~~c~~"]
+        for workers in (1, 2):
+            results = render_many(texts, workers=workers, plugins=["strikethrough"])
+            self.assertEqual([r.ok for r in results], [True, True, False, True])
+            self.assertEqual(results[0].output, "<h1>a</h1>\n")
+            self.assertEqual(results[3].output, "<p><del>c</del></p>\n")
+            self.assertIsInstance(results[2].error, AttributeError)
+
+        results = render_many(["**a**"], workers=1, renderer="markdown")
+        self.assertEqual(results[0].output, "**a**\n")
+
+    def test_render_cache(self):
+        from mistune.cache import RenderCache
+
+        md = mistune.create_markdown(renderer=None, plugins=["footnotes"])
+        cache = RenderCache(md, maxsize=2)
+        text = "a[^1]\n\n[^1]: note\n"
+        tokens, state = cache.parse(text)
+        self.assertEqual(tokens, md(text))
+        tokens2, state2 = cache.parse(text)
+        self.assertEqual(tokens2, tokens)
+        self.assertIsNot(tokens2, tokens)
+        self.assertIsNot(state2.env, state.env)
+        self.assertEqual(state2.env["ref_footnotes"], state.env["ref_footnotes"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache("b")
+        cache("c")
+        cache(text)
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+
+        # a new plugin changes the configuration
+        md.use(mistune.import_plugin("strikethrough"))
+        self.assertEqual(cache("~~c~~"), md("~~c~~"))
+        self.assertEqual(cache.misses, 5)
+
+        # so do replaced hooks and changed renderer options
+        def add_one(md, result, state):
+            return result + "1"
+
+        def add_two(md, result, state):
+            return result + "2"
+
+        md = mistune.create_markdown()
+        md.after_render_hooks.append(add_one)
+        cache = RenderCache(md)
+        self.assertEqual(cache("a <b>"), "<p>a &lt;b&gt;</p>\n1")
+        md.after_render_hooks[0] = add_two
+        self.assertEqual(cache("a <b>"), "<p>a &lt;b&gt;</p>\n2")
+        md.renderer._escape = False
+        self.assertEqual(cache("a <b>"), "<p>a <b></p>\n2")
+
+    def test_render_cache_directory(self):
+        import tempfile
+
+        from mistune.cache import DirectoryBackend, RenderCache
+
+        md = mistune.create_markdown()
+        with tempfile.TemporaryDirectory() as path:
+            backend = DirectoryBackend(path, maxsize=2)
+            cache = RenderCache(md, backend=backend)
+            self.assertEqual(cache("**a**"), "<p><strong>a</strong></p>\n")
+            self.assertEqual(RenderCache(md, backend=backend)("**a**"), "<p><strong>a</strong></p>\n")
+            cache("b")
+            cache("c")
+            # the files are evicted in batches
+            self.assertEqual(len(backend), 3)
+            cache("d")
+            self.assertEqual(len(backend), 2)
+            self.assertEqual(RenderCache(md, backend=backend)("d"), "<p>d</p>\n")
+            cache.clear()
+            self.assertEqual(len(backend), 0)
+
+    def test_precompile_pickle(self):
+        import pickle
+
+        plugins = ["table", "footnotes", "abbr", "math", "url", "def_list", "task_lists", "spoiler", "ruby"]
+        md = mistune.create_markdown(plugins=plugins + ["strikethrough", "mark", "insert", "subscript"])
+        size = len(pickle.dumps(md))
+        data = pickle.dumps(md.precompile())
+        # the compiled scanners are not pickled
+        self.assertLess(len(data), size * 1.1)
+        md2 = pickle.loads(data)
+        text = "*[HTML]: Hyper Text\n\nHTML ~~a~~ $b$ [^1]\n\n- [x] c\n\n[^1]: d\n"
+        self.assertEqual(md2(text), md(text))
+
+        # the dispatchers of the rules are compiled too
+        md = mistune.create_markdown(plugins=["table", "footnotes", "strikethrough", "math"]).precompile()
+        dispatcher = md.block.get_dispatcher()
+        self.assertIn("#", dispatcher._table)
+        self.assertIn("-", md.block.get_dispatcher(md.block.list_rules)._table)
+        self.assertIn("*", md.inline.get_dispatcher()._table)
+        md(text)
+        self.assertIs(md.block.get_dispatcher(), dispatcher)
+
+    def test_parse_blocks(self):
+        text = "# h1 *a*\n\n- b\n\n| a |\n| - |\n| c |\n"
+        md = mistune.create_markdown(plugins=["table"])
+        tokens, state = md.parse_blocks(text)
+        self.assertEqual(tokens[0], {"type": "heading", "text": "h1 *a*", "attrs": {"level": 1}, "style": "atx"})
+        self.assertEqual([tok["type"] for tok in tokens], ["heading", "blank_line", "list", "table"])
+        self.assertEqual(tokens[2]["children"][0]["children"][0], {"type": "block_text", "text": "b\n"})
+
+    def test_parse_lazy(self):
+        text = "# h1 *a*\n\n- b **c**\n\n```\ncode\n```\n"
+        md = mistune.create_markdown(renderer=None)
+        tokens, state = md.parse_lazy(text)
+        heading = tokens[0]
+        self.assertIsInstance(heading, mistune.LazyToken)
+        self.assertEqual(heading.inline_src, "h1 *a*")
+        self.assertFalse(heading.parsed)
+        self.assertIn("children", heading)
+        self.assertEqual(heading["children"][1]["type"], "emphasis")
+        self.assertTrue(heading.parsed)
+        self.assertEqual([tok.to_dict() for tok in tokens], md(text))
+
+        code = tokens[-1]
+        self.assertIsNone(code.inline_src)
+        self.assertEqual(code["raw"], "code\n")
+        self.assertNotIn("children", code)
+        self.assertIsNone(code.get("text"))
+        code["info"] = "py"
+        self.assertEqual(code.pop("info"), "py")
+
+    def test_profile_hook(self):
+        import io
+
+        from mistune.profiler import add_profile_hook, format_profile
+
+        md = mistune.create_markdown(plugins=["strikethrough"])
+        text = "# h1\n\nfoo *a* ~~b~~\n\n> c\n"
+        expected = md(text)
+        self.assertNotIn("profile", md.parse(text)[1].env)
+
+        add_profile_hook(md)
+        html, state = md.parse(text)
+        self.assertEqual(html, expected)
+        report = state.env["profile"]
+        self.assertEqual(report["block"]["atx_heading"]["calls"], 1)
+        self.assertEqual(report["block"]["paragraph"]["calls"], 2)
+        self.assertEqual(report["inline"]["strikethrough"]["bytes"], 5)
+        self.assertEqual(report["render"]["emphasis"]["calls"], 1)
+        self.assertIn("strikethrough", format_profile(report))
+
+        # the split wrappers of render_to are not recorded with the marker
+        state = md.render_to(io.StringIO(), text)
+        report = state.env["profile"]
+        self.assertNotIn("block_quote", report["render"])
+        self.assertEqual(report["render"]["strikethrough"]["bytes"], len("<del>b</del>"))
+
+    def test_block_state_find_line_end(self):
+        state = mistune.BlockState()
+        state.process("a\nbc\n\nd")
+        self.assertEqual(state.get_line(2), "bc\n")
+        self.assertEqual(state.find_line_end_at(6), 7)
+
+    def test_block_rule_dispatch(self):
+        from mistune.helpers import get_class_chars, guess_start_chars
+
+        self.assertEqual(guess_start_chars(r"^ {0,3}(?P<atx_1>#{1,6})"), {" ", "#"})
+        self.assertEqual(guess_start_chars(r"(?:a|b)?c"), {"a", "b", "c"})
+        self.assertIsNone(guess_start_chars(r"^ {0,3}\S"))
+        self.assertIsNone(guess_start_chars(r"a?"))
+        # "\d" and "\s" match unicode digits and spaces
+        self.assertIn("\u0661", guess_start_chars(r"\d{1,9}[.)]"))
+        self.assertIn("\u3000", guess_start_chars(r"[\s>]"))
+        self.assertIsNone(guess_start_chars(r"\w+"))
+        digits = {c for c in map(chr, range(sys.maxunicode + 1)) if c.isdecimal()}
+        self.assertEqual(get_class_chars("d"), digits)
+        self.assertEqual(mistune.html("\u0661. item"), "<ol>\n<li>item</li>\n</ol>\n")
+
+        def parse_note(block, m, state):
+            state.append_token({"type": "note", "raw": m.group("note_text")})
+            return m.end()
+
+        md = mistune.create_markdown(renderer=None)
+        self.assertEqual(md("%% a\n")[0]["type"], "paragraph")
+        md.block.register("note", r"^%% (?P<note_text>.*)\n", parse_note, before="paragraph")
+        self.assertEqual(md("%% a\n"), [{"type": "note", "raw": "a"}])
+
+    def test_long_paragraph_interrupters(self):
+        md = mistune.create_markdown(renderer=None)
+        self.assertIn("\u0661", md.block.get_start_chars("list"))
+        self.assertIsNotNone(md.block.get_dispatcher().interrupter)
+        self.assertIsNotNone(md.block.get_dispatcher().interrupter.match("\n\u0661"))
+        text = "a\nb\n  c\n \nd\n# e\nf\n> g\n"
+        types = [tok["type"] for tok in md.parse_blocks(text)[0]]
+        self.assertEqual(types, ["paragraph", "blank_line", "paragraph", "heading", "paragraph", "block_quote"])
+
+        # the start of the nptable rule can not be guessed
+        md = mistune.create_markdown(renderer=None, plugins=["table"])
+        self.assertIsNone(md.block.get_dispatcher().interrupter)
+        self.assertEqual(md.parse_blocks(text)[0][0]["text"], "a\nb\n  c\n")
+
+    def test_inline_rule_dispatch(self):
+        md = mistune.create_markdown(plugins=["strikethrough", "url"])
+        self.assertEqual(md.inline.get_start_chars("emphasis"), {"*", "_"})
+        self.assertEqual(md.inline.get_start_chars("linebreak"), {" ", "\\"})
+        self.assertEqual(md.inline.get_start_chars("strikethrough"), {"~"})
+
+        dispatcher = md.inline.get_dispatcher()
+        self.assertEqual(dispatcher.match("~~a~~", 0).lastgroup, "strikethrough")
+        self.assertIsNone(dispatcher.match("a~~", 0))
+
+        md.inline.register("at", r"@+", lambda inline, m, state: None)
+        self.assertIsNot(md.inline.get_dispatcher(), dispatcher)
+        self.assertEqual(md.inline.get_dispatcher().match("@a", 0).lastgroup, "at")
+
+    def test_fast_path_blockers(self):
+        plugins = ["table", "url", "math", "spoiler", "ruby", "footnotes", "abbr", "strikethrough", "mark"]
+        md = mistune.create_markdown(escape=False, plugins=plugins)
+        self.assertEqual(md.inline.fast_path_blockers(), [])
+        self.assertEqual(md.block.fast_path_blockers(), ["nptable"])
+
+        def parse_wow(inline, m, state):
+            state.append_token({"type": "text", "raw": m.group(0).upper()})
+            return m.end()
+
+        md.inline.register("wow", r"(?i:wow)", parse_wow)
+        self.assertEqual(md.inline.fast_path_blockers(), ["wow"])
+        md.inline.register("wow", r"(?i:wow)", parse_wow, start_chars="wW")
+        self.assertEqual(md.inline.fast_path_blockers(), [])
+        self.assertEqual(md("a Wow b").strip(), "<p>a WOW b</p>")
+
+    def test_inline_state_pool(self):
+        md = mistune.create_markdown(plugins=["table", "strikethrough"])
+        md.inline("[" * 50 + "~~a", {})
+        self.assertEqual(len(md.inline._state_pool), 1)
+        state = md.inline._state_pool[0]
+        self.assertEqual(state.no_close_bracket_before, 0)
+        self.assertEqual(state.formatting_no_end, {})
+
+        # the high-water marks of the previous source are not reused
+        self.assertEqual(md("[a](/b) ~~c~~").strip(), '<p><a href="/b">a</a> <del>c</del></p>')
+        self.assertIs(md.inline._state_pool[0], state)
+
+        text = "| a | b |\n| - | - |\n| [x](/y) | *z* |\n"
+        self.assertEqual(md(text), mistune.create_markdown(plugins=["table"])(text))
+
+    def test_inline_parse_many(self):
+        md = mistune.create_markdown(plugins=["footnotes"])
+        sources = ["[a", "*b* [^1]", "](/c) `d`", "e  \nf"]
+        env = {"ref_links": {}, "ref_footnotes": {"1": "x"}}
+        expected = [md.inline(s, {"ref_links": {}, "ref_footnotes": {"1": "x"}}) for s in sources]
+        self.assertEqual(md.inline.parse_many(sources, env), expected)
+        self.assertEqual(env["footnotes"], ["1"])
+
+    def test_find_ref_key(self):
+        from mistune.helpers import find_ref_key
+
+        env = {"ref_links": {"FOO BAR": {"url": "/a"}}}
+        self.assertEqual(find_ref_key(env, "ref_links", " foo\n Bar"), "FOO BAR")
+        self.assertIsNone(find_ref_key(env, "ref_links", "baz"))
+        self.assertIsNone(find_ref_key(env, "ref_footnotes", "foo bar"))
+
+        # definitions added later are found
+        env["ref_links"]["BAZ"] = {"url": "/b"}
+        self.assertEqual(find_ref_key(env, "ref_links", "baz"), "BAZ")
+
+        md = mistune.create_markdown()
+        text = "[Foo]: /a\n\n[foo] [FOO][] [x][foo] [bar]\n"
+        expected = '<p><a href="/a">foo</a> <a href="/a">FOO</a> <a href="/a">x</a> [bar]</p>\n'
+        self.assertEqual(md(text), expected)
+
+    def test_merge_text_tokens(self):
+        md = mistune.create_markdown(escape=False)
+        # the entity split by an escape is not unescaped
+        self.assertEqual(md("\\&amp; a \\* &lt;").strip(), "<p>&amp;amp; a * &lt;</p>")
+        md = mistune.create_markdown()
+        self.assertEqual(md('\\<b\\> "c"').strip(), "<p>&lt;b&gt; &quot;c&quot;</p>")
+        self.assertEqual(mistune.escape("plain text"), "plain text")
+
+    def test_renderer_dispatch_cache(self):
+        md = mistune.create_markdown(plugins=["footnotes"])
+        text = "a[^1]\n\n[^1]: b\n"
+        self.assertIn('<sup class="footnote-ref"', md(text))
+
+        md.renderer.register("footnote_ref", lambda renderer, key, index: "[%d]" % index)
+        self.assertIn("<p>a[1]</p>", md(text))
+
+    def test_abbr_regex_is_shared(self):
+        from mistune.plugins.abbr import compile_abbrs
+
+        md = mistune.create_markdown(plugins=["abbr"])
+        glossary = "\n\n*[W3C]: World Wide Web Consortium\n*[HTML]: Hyper Text Markup Language\n"
+        _, state1 = md.parse("HTML" + glossary)
+        _, state2 = md.parse("W3C" + glossary)
+        self.assertIs(state1.env["abbrs_re"], state2.env["abbrs_re"])
+        self.assertEqual(compile_abbrs(frozenset(["ab", "a", "ac"])).pattern, "a(?:b|c)?")
+
+    def test_reparse(self):
+        text = "# h1\n\nfoo\n\n- a\n- b\n\nbar\n\n> quote\n\nbaz\n"
+        md = mistune.create_markdown(renderer=None)
+        _, state = md.parse(text)
+        edits = [
+            (text.index("foo"), text.index("foo") + 3, "hello *world*"),
+            (text.index("bar"), text.index("bar"), "```\n"),
+            (text.index("- b"), text.index("- b") + 3, "- b\n- c"),
+            (0, 0, "    code\n\n"),
+        ]
+        for start, end, value in edits:
+            tokens, state = md.reparse(state, start, end, value)
+            self.assertEqual(tokens, md.parse(state.src)[0])
+
+        _, state = md.parse(text)
+        first = state.tokens[0]
+        last = state.tokens[-1]
+        pos = text.index("bar")
+        _, state = md.reparse(state, pos, pos + 3, "bar baz")
+        self.assertIs(state.tokens[0], first)
+        self.assertIs(state.tokens[-1], last)
+
+        # a new reference definition changes the whole document
+        md = mistune.create_markdown()
+        text = "[foo]\n\nbar\n"
+        _, state = md.parse(text)
+        pos = text.index("bar")
+        html, state = md.reparse(state, pos, pos + 3, "[foo]: /url")
+        self.assertEqual(html, '<p><a href="/url">foo</a></p>\n')
+        self.assertRaises(ValueError, md.reparse, state, 0, 100, "")
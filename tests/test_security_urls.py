@@ -74,3 +74,15 @@ class TestSafeUrlSecurity(TestCase):
         ]:
             rendered = html(f"[h]({url})")
             self.assertIn(f'href="{url}"', rendered, url)
+
+    def test_memoized_safe_url_follows_protocol_changes(self):
+        from mistune import HTMLRenderer
+
+        renderer = HTMLRenderer()
+        for _ in range(2):
+            self.assertEqual(renderer.safe_url("javascript:alert(1)"), "#harmful-link")
+            self.assertEqual(renderer.safe_url("https://a.b/?x&y"), "https://a.b/?x&amp;y")
+
+        renderer.SAFE_PROTOCOLS = ("javascript:",)
+        self.assertEqual(renderer.safe_url("javascript:alert(1)"), "javascript:alert(1)")
+        self.assertEqual(renderer.safe_url("https://a.b/"), "#harmful-link")